@@ -2,12 +2,82 @@
 
 from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 
+import pytest
 
-def pytest_configure() -> None:
+
+def pytest_configure(config: pytest.Config) -> None:
     # 确保项目根目录在 sys.path 中，便于 pytest 直接导入 kuaimai_ui。
     root = Path(__file__).resolve().parent
     if str(root) not in sys.path:
         sys.path.insert(0, str(root))
+
+    config.addinivalue_line("markers", "km_table(name): 数据文件中的一张表（YAML 节点名）")
+
+
+def _shard_count() -> int:
+    # pytest-xdist 会在每个 worker 里设置 PYTEST_XDIST_WORKER_COUNT。
+    raw = os.getenv("KM_SHARDS") or os.getenv("PYTEST_XDIST_WORKER_COUNT") or "1"
+    return max(1, int(raw))
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """按表分片。
+
+    - 使用 pytest-xdist（-n N --dist loadgroup）时，每个分片是一个 xdist_group，
+      同一分片的表固定在同一个 worker 上执行
+    - 多台机器分摊时设置 KM_SHARD_COUNT / KM_SHARD_INDEX，只保留本机的分片
+    """
+
+    table_items = [item for item in items if item.get_closest_marker("km_table")]
+    if not table_items:
+        return
+
+    from kuaimai_ui.flows.km_flow import load_table_specs_from_yaml, resolve_data_yaml_path
+    from kuaimai_ui.sharding import assign_shards
+
+    tables = load_table_specs_from_yaml(resolve_data_yaml_path())
+
+    machine_count = int(os.getenv("KM_SHARD_COUNT", "1"))
+    machine_index = int(os.getenv("KM_SHARD_INDEX", "0"))
+    if machine_count > 1:
+        machines = assign_shards(tables, machine_count)
+        keep: list[pytest.Item] = []
+        deselected: list[pytest.Item] = []
+        for item in items:
+            marker = item.get_closest_marker("km_table")
+            if marker is not None and machines.get(marker.args[0]) != machine_index:
+                deselected.append(item)
+            else:
+                keep.append(item)
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = keep
+        tables = [t for t in tables if machines.get(t.name) == machine_index]
+
+    shards = assign_shards(tables, _shard_count())
+    for item in items:
+        marker = item.get_closest_marker("km_table")
+        if marker is not None:
+            item.add_marker(pytest.mark.xdist_group(name=f"km-shard-{shards.get(marker.args[0], 0)}"))
+
+
+@pytest.fixture(scope="session")
+def km_session(browser):
+    """每个 worker 一个已登录、已选好应用的字段管理会话。
+
+    配置了多个账号时（见 kuaimai_ui/credentials.py），按 worker 序号轮流使用不同账号。
+    """
+
+    from kuaimai_ui import FieldSession
+    from kuaimai_ui.credentials import CredentialPool
+    from kuaimai_ui.flows.km_flow import leased_account_page
+
+    worker = os.getenv("PYTEST_XDIST_WORKER", "gw0")
+    index = int(worker[2:]) if worker[2:].isdigit() else 0
+    with leased_account_page(browser, CredentialPool.load(), prefer=index) as (page, account):
+        with FieldSession(page, account=account) as session:
+            yield session
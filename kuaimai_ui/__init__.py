@@ -1,19 +1,52 @@
 # -*- coding: utf-8 -*-
 
+"""快麦后台 UI 自动化。
+
+导出的名称按需加载：只 import kuaimai_ui（或命令行的轻量子命令）时不会加载流程模块，
+启动更快。
+"""
+
 from __future__ import annotations
 
-from .flows.km_flow import (
-    FieldSpec,
-    create_fields,
-    create_tables_from_yaml,
-    login,
-    print_playwright_setup_help,
-)
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .flows.km_flow import (
+        FieldSession,
+        FieldSpec,
+        TableResult,
+        create_fields,
+        create_tables_from_yaml,
+        login,
+        print_playwright_setup_help,
+    )
+
+_LAZY = {
+    'FieldSession': '.flows.km_flow',
+    'FieldSpec': '.flows.km_flow',
+    'TableResult': '.flows.km_flow',
+    'create_fields': '.flows.km_flow',
+    'create_tables_from_yaml': '.flows.km_flow',
+    'login': '.flows.km_flow',
+    'print_playwright_setup_help': '.flows.km_flow',
+}
 
 __all__ = [
+    'FieldSession',
     'FieldSpec',
+    'TableResult',
     'create_fields',
     'create_tables_from_yaml',
     'login',
     'print_playwright_setup_help',
 ]
+
+
+def __getattr__(name: str) -> object:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+
+"""python -m kuaimai_ui <子命令>，详见 kuaimai_ui/cli.py。"""
+
+from __future__ import annotations
+
+from .cli import main
+
+raise SystemExit(main())
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+"""数据文件（data.yaml）的离线检查与自动修复。
+
+一次遍历建立索引（字段 -> 所在的表、table_name -> YAML 节点），据此发现：
+
+- 同一张表里重复的字段（服务器保存时才提示“字段名不能重复”，白填一整张表）
+- 只差全角/半角或首尾空格的“重复”字段，例如 会员手机号(脱敏) 与 会员手机号（脱敏）
+- 空字段名
+- 多个节点使用同一个 table_name（后面的表会被服务器当成重名跳过）
+- 没有字段的表
+- 重复的 YAML 节点名（PyYAML 会静默保留最后一个）
+
+自动修复：去掉重复/空字段（保留第一次出现的位置），同名表的字段合并到第一个节点，
+删除空表；然后按原格式写回数据文件。
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .flows.km_flow import TableSpec
+
+# 顶层 YAML 节点（不缩进、以冒号结尾）。
+_TOP_KEY = re.compile(r"^([^\s#][^:]*):\s*(?:#.*)?$")
+
+
+def normalize_field(value: str) -> str:
+    """比较用的字段名：全角转半角（NFKC）并去掉首尾空白。"""
+
+    return unicodedata.normalize("NFKC", value).strip()
+
+
+def dedupe_fields(fields: Iterable[str], *, exact: bool = False) -> tuple[list[str], list[str]]:
+    """去掉空字段与重复字段（按 normalize_field 比较，保留第一次出现的写法）。
+
+    exact=True 时只去掉完全相同的字段，全角/半角不同的写法保留
+    （服务器是否当成重复并不确定，只在 check 中提示）。
+    返回（保留的字段, 去掉的字段）。
+    """
+
+    kept: list[str] = []
+    dropped: list[str] = []
+    seen: set[str] = set()
+    for value in fields:
+        key = value if exact else normalize_field(value)
+        if not value.strip() or key in seen:
+            dropped.append(value)
+            continue
+        seen.add(key)
+        kept.append(value)
+    return kept, dropped
+
+
+def duplicate_keys(raw_text: str) -> list[str]:
+    """原始 YAML 文本里重复出现的顶层节点名。"""
+
+    seen: set[str] = set()
+    dupes: list[str] = []
+    for line in raw_text.splitlines():
+        match = _TOP_KEY.match(line)
+        if not match:
+            continue
+        key = match.group(1).strip().strip("'\"")
+        if key in seen and key not in dupes:
+            dupes.append(key)
+        seen.add(key)
+    return dupes
+
+
+@dataclass
+class CatalogIndex:
+    """数据文件的索引。"""
+
+    # 规范化后的字段名 -> 使用该字段的 YAML 节点（按出现顺序，同一节点只记一次）
+    field_tables: dict[str, list[str]] = field(default_factory=dict)
+    # table_name -> YAML 节点
+    table_keys: dict[str, list[str]] = field(default_factory=dict)
+
+    def tables_with_field(self, name: str) -> list[str]:
+        return list(self.field_tables.get(normalize_field(name), ()))
+
+    def shared_fields(self, min_tables: int = 2) -> list[tuple[str, int]]:
+        """被多张表使用的字段及表数，从多到少。"""
+
+        items = [(name, len(keys)) for name, keys in self.field_tables.items() if len(keys) >= min_tables]
+        return sorted(items, key=lambda item: (-item[1], item[0]))
+
+
+@dataclass(frozen=True)
+class LintIssue:
+    # duplicate_field / blank_field / conflicting_table_name / empty_table / duplicate_key
+    kind: str
+    key: str
+    message: str
+    fixable: bool = True
+
+
+@dataclass
+class LintReport:
+    index: CatalogIndex
+    issues: list[LintIssue] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+    @property
+    def fixable(self) -> list[LintIssue]:
+        return [issue for issue in self.issues if issue.fixable]
+
+    def lines(self) -> list[str]:
+        return [f"{issue.key}：{issue.message}" for issue in self.issues]
+
+
+def lint_tables(tables: list["TableSpec"], *, raw_text: str | None = None) -> LintReport:
+    """一次遍历建立索引并收集问题。raw_text 为原始 YAML 文本（用于检查重复节点名）。"""
+
+    index = CatalogIndex()
+    issues: list[LintIssue] = []
+
+    for table in tables:
+        index.table_keys.setdefault(table.table_name.strip(), []).append(table.name)
+
+        if not table.fields:
+            issues.append(LintIssue("empty_table", table.name, f"表“{table.table_name}”没有字段"))
+            continue
+
+        first_seen: dict[str, str] = {}
+        for value in table.fields:
+            key = normalize_field(value)
+            if not key:
+                issues.append(LintIssue("blank_field", table.name, "包含空字段名"))
+                continue
+            if key in first_seen:
+                original = first_seen[key]
+                detail = f"字段“{value}”重复" if value == original else f"字段“{value}”与“{original}”重复"
+                issues.append(LintIssue("duplicate_field", table.name, detail))
+                continue
+            first_seen[key] = value
+            index.field_tables.setdefault(key, []).append(table.name)
+
+    for table_name, keys in index.table_keys.items():
+        if len(keys) > 1:
+            for key in keys[1:]:
+                issues.append(
+                    LintIssue(
+                        "conflicting_table_name",
+                        key,
+                        f"table_name“{table_name}”与 {keys[0]} 相同（修复时字段合并到 {keys[0]}）",
+                    )
+                )
+
+    if raw_text is not None:
+        for key in duplicate_keys(raw_text):
+            issues.append(
+                LintIssue("duplicate_key", key, "节点名重复，只有最后一个会生效，请手动改名", fixable=False)
+            )
+
+    return LintReport(index=index, issues=issues)
+
+
+def fix_tables(tables: list["TableSpec"]) -> tuple[list["TableSpec"], list[str]]:
+    """返回（修复后的表, 修改说明）。不修改传入的对象。"""
+
+    from .flows.km_flow import TableSpec
+
+    changes: list[str] = []
+    merged: dict[str, list[str]] = {}
+    owner: dict[str, str] = {}
+    order: list[TableSpec] = []
+
+    for table in tables:
+        table_name = table.table_name.strip()
+        if table_name in owner:
+            merged[owner[table_name]].extend(table.fields)
+            changes.append(f"{table.name}：table_name 与 {owner[table_name]} 相同，字段已合并过去，删除该节点")
+            continue
+        owner[table_name] = table.name
+        merged[table.name] = list(table.fields)
+        order.append(table)
+
+    fixed: list[TableSpec] = []
+    for table in order:
+        fields, dropped = dedupe_fields(merged[table.name])
+        if dropped:
+            shown = "、".join(f"“{d}”" for d in dropped)
+            changes.append(f"{table.name}：去掉重复或空的字段 {shown}")
+        if not fields:
+            changes.append(f"{table.name}：没有字段，删除该节点")
+            continue
+        fixed.append(TableSpec(name=table.name, table_name=table.table_name, fields=fields))
+    return fixed, changes
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+"""命令行入口：python -m kuaimai_ui <子命令>
+
+- run：登录并根据 YAML 新建字段（需要 Playwright）
+- plan：对比同步清单，列出下次运行要处理的表（不打开浏览器）
+- export：导出服务器现有的表与字段（本地快照可用时不打开浏览器）
+- check：检查数据文件与代码文本
+- report：运行历史的趋势与回归报告
+- doctor：检查运行环境
+
+本模块只依赖标准库；Playwright、PyYAML 只在需要它们的子命令里导入，
+方便外部工具频繁调用 plan/check 等轻量命令。
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+from .paths import PROJECT_ROOT
+
+
+def _cmd_run(args: argparse.Namespace) -> int:
+    from .runner import run
+
+    run(
+        app_name=args.app,
+        yaml_path=args.yaml,
+        headless=args.headless,
+        slow_mo=args.slow_mo if args.slow_mo is not None else (0 if args.headless else 300),
+        incremental=False if args.full else None,
+        verify=False if args.no_verify else None,
+        workers=args.workers,
+    )
+    return 0
+
+
+def _cmd_plan(args: argparse.Namespace) -> int:
+    from .flows.km_flow import get_app_name, load_table_specs_from_yaml, resolve_data_yaml_path
+    from .manifest import Manifest
+
+    app_name = get_app_name(args.app)
+    tables = load_table_specs_from_yaml(resolve_data_yaml_path(args.yaml))
+    plan = Manifest.load().plan(app_name, tables)
+
+    print(f"应用：{app_name}，共 {len(tables)} 张表：{plan.summary()}")
+    for table in plan.new:
+        print(f"  新增：{table.table_name}（{len(table.fields)} 个字段）")
+    for table, added in plan.changed:
+        print(f"  追加：{table.table_name} -> {'、'.join(added)}")
+    return 0
+
+
+def _cmd_export(args: argparse.Namespace) -> int:
+    from .flows.export_flow import export_app_snapshot
+    from .flows.km_flow import get_app_name, load_table_specs_from_yaml, resolve_data_yaml_path
+    from .snapshot import diff_tables, load_cached_snapshot
+
+    app_name = get_app_name(args.app)
+
+    if args.max_age is not None and load_cached_snapshot(app_name, max_age_s=args.max_age) is not None:
+        snapshot = export_app_snapshot(None, app_name=app_name, out_path=args.out, max_age_s=args.max_age)
+    else:
+        from .flows.km_flow import login, print_playwright_setup_help
+
+        try:
+            from playwright.sync_api import sync_playwright
+        except ImportError as exc:
+            print_playwright_setup_help(f"导入 Playwright 失败：{exc}")
+            return 2
+
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=not args.headed)
+            try:
+                page = browser.new_page()
+                login(page)
+                snapshot = export_app_snapshot(page, app_name=app_name, out_path=args.out)
+            finally:
+                browser.close()
+
+    if not args.diff:
+        return 0
+
+    diff = diff_tables(load_table_specs_from_yaml(resolve_data_yaml_path(args.yaml)), snapshot.tables)
+    for line in diff.lines():
+        print(line)
+    if diff.ok:
+        print("数据文件中的表与字段在服务器上都已存在。")
+    return 0 if diff.ok else 1
+
+
+def _run_text_guard() -> int:
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location("text_guard", PROJECT_ROOT / "tools" / "text_guard.py")
+    if spec is None or spec.loader is None:
+        return 0
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    paths = [str(PROJECT_ROOT / name) for name in ("kuaimai_ui", "scripts", "tests", "tools")]
+    paths += [str(p) for p in sorted(PROJECT_ROOT.glob("*.py"))]
+    return int(module.main(paths))
+
+
+def _lint_catalog(yaml_file: Path, tables: list, *, fix: bool, field: str | None) -> bool:
+    """检查数据文件内容；返回是否仍有问题。"""
+
+    from .catalog import fix_tables, lint_tables
+    from .flows.km_flow import dump_table_specs_yaml
+
+    report = lint_tables(tables, raw_text=yaml_file.read_text(encoding="utf-8"))
+
+    if field:
+        keys = report.index.tables_with_field(field)
+        print(f"字段“{field}”出现在 {len(keys)} 张表：{'、'.join(keys) or '无'}")
+
+    if report.ok:
+        print("数据文件内容检查通过（无重复字段、重名表或空表）")
+        return False
+
+    for line in report.lines():
+        print(f"  {line}")
+
+    if not fix:
+        print(
+            f"数据文件有 {len(report.issues)} 个问题，其中 {len(report.fixable)} 个可自动修复"
+            "（python -m kuaimai_ui check --fix）",
+            file=sys.stderr,
+        )
+        return True
+
+    if len(report.fixable) < len(report.issues):
+        # 重复的节点名在解析时已丢失前面的内容，写回会把它们删掉，必须先手动处理。
+        print("存在无法自动修复的问题，请先手动处理后再运行 --fix", file=sys.stderr)
+        return True
+
+    fixed, changes = fix_tables(tables)
+    yaml_file.write_text(dump_table_specs_yaml(fixed), encoding="utf-8")
+    for change in changes:
+        print(f"  已修复：{change}")
+    print(f"已写回：{yaml_file}（{len(fixed)} 张表）")
+    return False
+
+
+def _cmd_check(args: argparse.Namespace) -> int:
+    from .flows.km_flow import load_table_specs_from_yaml, resolve_data_yaml_path
+
+    failed = False
+    yaml_file = resolve_data_yaml_path(args.yaml)
+    try:
+        tables = load_table_specs_from_yaml(yaml_file)
+    except RuntimeError as exc:
+        print(f"数据文件检查失败：{exc}", file=sys.stderr)
+        failed = True
+    else:
+        print(f"数据文件：{yaml_file}，{len(tables)} 张表，{sum(len(t.fields) for t in tables)} 个字段")
+        if _lint_catalog(yaml_file, tables, fix=args.fix, field=args.field):
+            failed = True
+
+    if _run_text_guard() != 0:
+        failed = True
+    else:
+        print("代码文本检查通过")
+
+    return 1 if failed else 0
+
+
+def _cmd_report(args: argparse.Namespace) -> int:
+    from .history import build_report
+
+    for line in build_report(app=args.app, last=args.last, top=args.top):
+        print(line)
+    return 0
+
+
+def _cmd_doctor(args: argparse.Namespace) -> int:
+    from .doctor import main as doctor_main
+
+    return doctor_main(args.extra)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m kuaimai_ui", description="快麦后台 UI 自动化")
+    sub = parser.add_subparsers(dest="command", metavar="<子命令>", required=True)
+
+    p = sub.add_parser("run", help="登录并根据 YAML 新建字段")
+    p.add_argument("--app", help="应用名（默认读取 settings.APP_NAME）")
+    p.add_argument("--yaml", help="数据文件路径（默认读取 settings.DATA_YAML_PATH）")
+    p.add_argument("--headless", action="store_true", help="不显示浏览器窗口")
+    p.add_argument("--slow-mo", type=int, help="每个操作的延迟（毫秒，默认：可视化 300，headless 0）")
+    p.add_argument("--full", action="store_true", help="忽略同步清单，全量运行")
+    p.add_argument("--no-verify", action="store_true", help="跳过保存后核对")
+    p.add_argument("--workers", type=int, help="并行 worker 数（默认读取 settings.WORKERS，不超过账号池的会话名额）")
+    p.set_defaults(func=_cmd_run)
+
+    p = sub.add_parser("plan", help="列出下次运行要处理的表（不打开浏览器）")
+    p.add_argument("--app", help="应用名（默认读取 settings.APP_NAME）")
+    p.add_argument("--yaml", help="数据文件路径")
+    p.set_defaults(func=_cmd_plan)
+
+    p = sub.add_parser("export", help="导出服务器现有的表与字段（data.yaml 格式）")
+    p.add_argument("--app", help="应用名（默认读取 settings.APP_NAME）")
+    p.add_argument("--out", help="输出 YAML 路径（不传则只更新本地缓存）")
+    p.add_argument("--max-age", type=float, help="本地快照不超过该秒数时直接使用，不打开浏览器")
+    p.add_argument("--diff", action="store_true", help="与数据文件对比，列出服务器上缺少的表/字段")
+    p.add_argument("--yaml", help="--diff 使用的数据文件路径")
+    p.add_argument("--headed", action="store_true", help="显示浏览器窗口")
+    p.set_defaults(func=_cmd_export)
+
+    p = sub.add_parser("check", help="检查数据文件与代码文本")
+    p.add_argument("--yaml", help="数据文件路径")
+    p.add_argument("--fix", action="store_true", help="自动修复数据文件（去重复/空字段、合并重名表、删除空表）并写回")
+    p.add_argument("--field", help="列出使用该字段的表")
+    p.set_defaults(func=_cmd_check)
+
+    p = sub.add_parser("report", help="运行历史：趋势、最慢的表、与前几次运行相比的回归")
+    p.add_argument("--app", help="应用名（默认取最近一次运行的应用）")
+    p.add_argument("--last", type=int, default=10, help="对比最近多少次运行（默认：10）")
+    p.add_argument("--top", type=int, default=10, help="最多列出多少张表（默认：10）")
+    p.set_defaults(func=_cmd_report)
+
+    # doctor 的参数（--perf 等）原样转交给 kuaimai_ui/doctor.py 解析。
+    p = sub.add_parser("doctor", help="检查运行环境（--perf 测量耗时）", add_help=False)
+    p.set_defaults(func=_cmd_doctor, passthrough=True)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and not getattr(args, "passthrough", False):
+        parser.error(f"无法识别的参数：{' '.join(extra)}")
+    args.extra = extra
+    func: Callable[[argparse.Namespace], int] = args.func
+    try:
+        return func(args)
+    except RuntimeError as exc:
+        print(str(exc), file=sys.stderr)
+        return 1
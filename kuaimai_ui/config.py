@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+"""读取配置：环境变量 KM_* 优先，其次 kuaimai_ui/settings.py，最后是代码里的默认值。"""
+
+from __future__ import annotations
+
+import os
+from typing import TypeVar
+
+from . import settings
+
+T = TypeVar("T", str, int, float)
+
+# 环境变量取这些值（不区分大小写）时视为关闭；设置了但为空也视为关闭。
+_FALSE_VALUES = ("0", "false", "no", "off", "")
+
+
+def setting_flag(env: str, name: str, default: bool) -> bool:
+    """开关：设置了环境变量 env 时按其取值，否则取 settings.name，都没有时为 default。"""
+
+    raw = os.getenv(env)
+    if raw is not None:
+        return raw.strip().lower() not in _FALSE_VALUES
+    return bool(getattr(settings, name, default))
+
+
+def setting_value(env: str, name: str, default: T) -> T:
+    """数值/字符串配置：环境变量 env（非空）> settings.name（非空）> default，并转换成 default 的类型。"""
+
+    raw = os.getenv(env)
+    if raw is not None and raw.strip() != "":
+        return type(default)(raw.strip())
+    value = getattr(settings, name, None)
+    if value is None or value == "":
+        return default
+    return type(default)(value)
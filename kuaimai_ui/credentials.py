@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+"""多账号凭据池。
+
+单个账号能同时打开的会话有限，并发数再高也会卡在账号上。凭据池管理多个账号：
+
+- 账号来源（按顺序取第一个有内容的）：
+  1) 环境变量 KM_ACCOUNTS："手机号:密码[:会话数],手机号:密码[:会话数]"
+  2) 账号文件（KM_ACCOUNTS_FILE 或 settings.ACCOUNTS_FILE），每行 "手机号:密码[:会话数]"，# 开头为注释
+  3) KM_PHONE / KM_PASSWORD（或内置默认账号），只有一个账号
+- 密码里可以有冒号：只按第一个冒号分出手机号，末尾的 ":数字" 才当作会话数；
+  密码本身以 ":数字" 结尾时在最后再加一个冒号（"手机号:密码:"）
+- 每个账号有自己的并发名额（会话数，默认 settings.MAX_SESSIONS_PER_ACCOUNT）
+- 分配时优先选当前会话最少的账号，并发能力随账号数增加
+- 登录失败（尤其是被锁定/提示频繁）的账号暂停分配一段时间，连续失败时等待时间翻倍
+- 每个账号的登录状态（storage_state）缓存在 .km_cache/sessions/，下次直接复用
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .config import setting_value
+from .paths import PROJECT_ROOT, cache_dir
+
+DEFAULT_PHONE = "13826056942"
+DEFAULT_PASSWORD = "666666"
+
+# 登录失败后暂停分配的基础秒数与上限；被锁定时从 LOCKOUT_BACKOFF_S 开始翻倍。
+FAILURE_BACKOFF_S = 30.0
+LOCKOUT_BACKOFF_S = 300.0
+MAX_BACKOFF_S = 3600.0
+
+
+@dataclass(frozen=True)
+class Account:
+    phone: str
+    password: str = field(repr=False)
+    # None 表示使用 settings.MAX_SESSIONS_PER_ACCOUNT。
+    max_sessions: int | None = None
+
+    @property
+    def label(self) -> str:
+        """日志里显示的账号（中间四位打码）。"""
+
+        if len(self.phone) >= 11:
+            return f"{self.phone[:3]}****{self.phone[-4:]}"
+        return self.phone
+
+
+def _parse_account(raw: str) -> Account | None:
+    raw = raw.strip()
+    if not raw or raw.startswith("#"):
+        return None
+    phone, sep, password = raw.partition(":")
+    phone = phone.strip()
+    if not sep or not phone:
+        raise RuntimeError(f"账号格式错误（应为 手机号:密码[:会话数]）：{phone}:***")
+    sessions = None
+    head, sep, tail = password.rpartition(":")
+    if sep and not tail.strip():
+        # 末尾单独的冒号：没有会话数，前面全是密码。
+        password = head
+    elif sep and tail.strip().isdigit():
+        password = head
+        sessions = max(1, int(tail))
+    return Account(phone=phone, password=password, max_sessions=sessions)
+
+
+def _accounts_file() -> Path | None:
+    raw = setting_value("KM_ACCOUNTS_FILE", "ACCOUNTS_FILE", "")
+    if not raw:
+        return None
+    path = Path(raw)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+def default_account() -> Account:
+    """KM_PHONE / KM_PASSWORD 指定的账号（未设置时为内置默认账号）。"""
+
+    return Account(
+        phone=os.getenv("KM_PHONE", DEFAULT_PHONE),
+        password=os.getenv("KM_PASSWORD", DEFAULT_PASSWORD),
+    )
+
+
+def load_accounts() -> list[Account]:
+    raw = os.getenv("KM_ACCOUNTS", "")
+    items = [a for a in (_parse_account(part) for part in raw.split(",")) if a is not None]
+
+    if not items:
+        path = _accounts_file()
+        if path is not None:
+            try:
+                lines = path.read_text(encoding="utf-8").splitlines()
+            except FileNotFoundError as exc:
+                raise RuntimeError(f"找不到账号文件：{path}") from exc
+            items = [a for a in (_parse_account(line) for line in lines) if a is not None]
+
+    if not items:
+        return [default_account()]
+
+    # 同一手机号只保留第一次出现的配置。
+    seen: set[str] = set()
+    return [a for a in items if not (a.phone in seen or seen.add(a.phone))]
+
+
+def session_state_path(account: Account) -> Path:
+    """账号登录状态（storage_state）的缓存文件。"""
+
+    path = cache_dir() / "sessions" / f"{account.phone}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def cached_session_state(account: Account) -> Path | None:
+    """未过期的登录状态缓存；没有或已过期时返回 None。"""
+
+    max_age = setting_value("KM_SESSION_MAX_AGE_S", "SESSION_CACHE_MAX_AGE_S", 0.0)
+    path = session_state_path(account)
+    try:
+        age = time.time() - path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if max_age and age > max_age:
+        return None
+    return path
+
+
+def forget_session_state(account: Account) -> None:
+    session_state_path(account).unlink(missing_ok=True)
+
+
+class CredentialPool:
+    """把账号分配给 worker：每个账号有并发名额，登录失败的账号暂停一段时间。"""
+
+    def __init__(self, accounts: list[Account], *, default_sessions: int | None = None) -> None:
+        if not accounts:
+            raise RuntimeError("账号池为空")
+        if default_sessions is None:
+            default_sessions = setting_value("KM_SESSIONS_PER_ACCOUNT", "MAX_SESSIONS_PER_ACCOUNT", 2)
+        self.accounts = list(accounts)
+        self._default_sessions = max(1, int(default_sessions))
+        self._cond = threading.Condition()
+        self._active: dict[str, int] = {a.phone: 0 for a in self.accounts}
+        self._failures: dict[str, int] = {a.phone: 0 for a in self.accounts}
+        self._blocked_until: dict[str, float] = {a.phone: 0.0 for a in self.accounts}
+
+    @classmethod
+    def load(cls) -> "CredentialPool":
+        return cls(load_accounts())
+
+    def quota(self, account: Account) -> int:
+        return account.max_sessions or self._default_sessions
+
+    @property
+    def capacity(self) -> int:
+        """所有账号的并发名额之和。"""
+
+        return sum(self.quota(a) for a in self.accounts)
+
+    def _pick(self, prefer: int, now: float) -> Account | None:
+        n = len(self.accounts)
+        ordered = [self.accounts[(prefer + i) % n] for i in range(n)]
+        candidates = [
+            a for a in ordered if self._active[a.phone] < self.quota(a) and self._blocked_until[a.phone] <= now
+        ]
+        if not candidates:
+            return None
+        # 占用比例最低的账号优先；相同时按 prefer 轮换后的顺序。
+        return min(candidates, key=lambda a: self._active[a.phone] / self.quota(a))
+
+    @contextmanager
+    def lease(self, *, prefer: int = 0) -> Iterator[Account]:
+        """占用一个账号的一个会话名额；没有可用账号时等待。
+
+        prefer：从第几个账号开始选（例如按 worker 序号），让不同进程尽量用不同账号。
+        """
+
+        waited = False
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                account = self._pick(prefer, now)
+                if account is not None:
+                    break
+                if not waited:
+                    print("所有账号的会话名额已用完或暂停中，等待可用账号……")
+                    waited = True
+                pending = [t - now for t in self._blocked_until.values() if t > now]
+                self._cond.wait(timeout=min(pending) if pending else None)
+            self._active[account.phone] += 1
+        try:
+            yield account
+        finally:
+            with self._cond:
+                self._active[account.phone] -= 1
+                self._cond.notify_all()
+
+    def report_success(self, account: Account) -> None:
+        with self._cond:
+            self._failures[account.phone] = 0
+
+    def report_failure(self, account: Account, *, locked: bool = False) -> float:
+        """登录失败：暂停分配该账号，返回暂停的秒数。"""
+
+        with self._cond:
+            self._failures[account.phone] += 1
+            base = LOCKOUT_BACKOFF_S if locked else FAILURE_BACKOFF_S
+            delay = min(MAX_BACKOFF_S, base * 2 ** (self._failures[account.phone] - 1))
+            self._blocked_until[account.phone] = time.monotonic() + delay
+            self._cond.notify_all()
+        reason = "被锁定或登录过于频繁" if locked else "登录失败"
+        print(f"账号 {account.label} {reason}，{delay:.0f} 秒内不再分配")
+        return delay
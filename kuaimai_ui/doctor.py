@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+"""运行环境检查：Python、VC++ 运行库、greenlet、Playwright 与浏览器目录。
+
+--perf：测量浏览器启动、新建上下文、本地页面导航、输入往返与登录耗时，
+并与保存的基线对比，用来判断慢在本机、浏览器还是远程后台。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import struct
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from importlib import metadata
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+# 比基线慢多少倍算异常。
+SLOW_RATIO = 1.5
+# 输入往返测量次数（取中位数）。
+FILL_ROUNDS = 20
+
+_BASELINE_FILE = "perf_baseline.json"
+
+_STATIC_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>doctor</title></head>
+<body><input id="probe" placeholder="probe"><button id="go">go</button></body></html>
+"""
+
+# 指标所属的层：用于最后给出“慢在哪里”的结论。
+_LAYERS = {
+    "launch_cold_ms": "machine",
+    "launch_warm_ms": "machine",
+    "new_context_ms": "browser",
+    "navigate_ms": "browser",
+    "fill_roundtrip_ms": "browser",
+    "login_ms": "remote",
+}
+_LAYER_TEXT = {
+    "machine": "本机（CPU/磁盘/系统负载）",
+    "browser": "浏览器（Chromium 本身或驱动通信）",
+    "remote": "远程后台（网络或服务端）",
+}
+
+
+def _find_windows_dll(dll_name: str) -> list[Path]:
+    if os.name != "nt":
+        return []
+    windir = Path(os.environ.get("WINDIR", "C:/Windows"))
+    candidates = [windir / "System32" / dll_name, windir / "SysWOW64" / dll_name]
+    return [p for p in candidates if p.exists()]
+
+
+@contextmanager
+def _static_server() -> Iterator[str]:
+    """在 127.0.0.1 的随机端口上提供一个静态测试页，返回其 URL。"""
+
+    with TemporaryDirectory() as tmp:
+        (Path(tmp) / "index.html").write_text(_STATIC_PAGE, encoding="utf-8")
+
+        class _Handler(SimpleHTTPRequestHandler):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, directory=tmp, **kwargs)
+
+            def log_message(self, format, *args):  # noqa: A002
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f"http://127.0.0.1:{server.server_address[1]}/index.html"
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def _ms(func: Callable[[], object]) -> tuple[float, object]:
+    start = time.perf_counter()
+    value = func()
+    return (time.perf_counter() - start) * 1000, value
+
+
+def _measure_perf(*, with_login: bool) -> tuple[dict[str, float], dict[str, str]]:
+    """返回（指标耗时, 失败的指标及原因）。登录失败不影响其他指标。"""
+
+    from playwright.sync_api import sync_playwright
+
+    metrics: dict[str, float] = {}
+    failures: dict[str, str] = {}
+    with sync_playwright() as p, _static_server() as url:
+        cold_ms, browser = _ms(lambda: p.chromium.launch(headless=True))
+        browser.close()
+        metrics["launch_cold_ms"] = cold_ms
+
+        warm_ms, browser = _ms(lambda: p.chromium.launch(headless=True))
+        metrics["launch_warm_ms"] = warm_ms
+        try:
+            metrics["new_context_ms"], context = _ms(browser.new_context)
+            page = context.new_page()
+            metrics["navigate_ms"], _ = _ms(lambda: page.goto(url, wait_until="load"))
+
+            probe = page.locator("#probe")
+            rounds: list[float] = []
+            for i in range(FILL_ROUNDS):
+                value = f"probe-{i}"
+                elapsed, _ = _ms(lambda: (probe.fill(value), probe.input_value()))
+                rounds.append(elapsed)
+            metrics["fill_roundtrip_ms"] = sorted(rounds)[len(rounds) // 2]
+            context.close()
+
+            if with_login:
+                from .flows.km_flow import login
+
+                context = browser.new_context()
+                try:
+                    page = context.new_page()
+                    metrics["login_ms"], _ = _ms(lambda: login(page))
+                except Exception as exc:
+                    failures["login_ms"] = (str(exc) or exc.__class__.__name__).splitlines()[0]
+                finally:
+                    context.close()
+        finally:
+            browser.close()
+
+    return metrics, failures
+
+
+def _baseline_path() -> Path:
+    from .paths import cache_dir
+
+    return cache_dir() / _BASELINE_FILE
+
+
+def _load_baseline() -> dict[str, float]:
+    try:
+        raw = json.loads(_baseline_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {k: float(v) for k, v in raw.items() if isinstance(v, (int, float))} if isinstance(raw, dict) else {}
+
+
+def _report_perf(
+    metrics: dict[str, float], baseline: dict[str, float], failures: dict[str, str] | None = None
+) -> list[str]:
+    """打印对比结果，返回变慢或失败的指标名。"""
+
+    slow: list[str] = []
+    for name, reason in (failures or {}).items():
+        slow.append(name)
+        print(f"{name}: FAIL -> {reason}")
+    for name, value in metrics.items():
+        base = baseline.get(name)
+        if base is None or base <= 0:
+            print(f"{name}: {value:.1f} ms (no baseline)")
+            continue
+        ratio = value / base
+        flag = "SLOW" if ratio > SLOW_RATIO else "OK"
+        if flag == "SLOW":
+            slow.append(name)
+        print(f"{name}: {value:.1f} ms (baseline {base:.1f} ms, x{ratio:.2f}) {flag}")
+    return slow
+
+
+def _run_perf(*, save_baseline: bool) -> int:
+    try:
+        from playwright.sync_api import sync_playwright  # noqa: F401
+    except Exception as exc:
+        print("playwright.sync_api: FAIL ->", exc)
+        return 2
+
+    with_login = bool(os.getenv("KM_PHONE") and os.getenv("KM_PASSWORD"))
+    if not with_login:
+        print("login: skipped (set KM_PHONE and KM_PASSWORD to measure login latency)")
+
+    metrics, failures = _measure_perf(with_login=with_login)
+    slow = _report_perf(metrics, _load_baseline(), failures)
+
+    if save_baseline:
+        path = _baseline_path()
+        merged = {**_load_baseline(), **{k: round(v, 1) for k, v in metrics.items()}}
+        path.write_text(json.dumps(merged, indent=2), encoding="utf-8")
+        print("baseline saved:", path)
+
+    if slow:
+        layers = sorted({_LAYERS.get(name, "browser") for name in slow})
+        label = "比基线明显变慢或失败" if failures else "比基线明显变慢"
+        print(f"{label}：" + "、".join(_LAYER_TEXT[layer] for layer in layers))
+        return 1
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="doctor", description="检查运行环境。")
+    parser.add_argument("--perf", action="store_true", help="测量浏览器启动、导航、输入往返与登录耗时，并与基线对比")
+    parser.add_argument("--save-baseline", action="store_true", help="配合 --perf：把本次结果保存为基线")
+    args = parser.parse_args(argv)
+
+    print("Python:", sys.executable)
+    print("Version:", sys.version.replace("\n", " "))
+    print("Bits:", struct.calcsize("P") * 8)
+    print("OS:", platform.platform())
+
+    dll = "vcruntime140_1.dll"
+    dll_paths = _find_windows_dll(dll)
+    if dll_paths:
+        print(f"{dll}: OK ({dll_paths[0]})")
+    else:
+        print(f"{dll}: MISSING (likely need Microsoft Visual C++ Redistributable 2015-2022 x64)")
+
+    try:
+        import greenlet  # noqa: F401
+        print("greenlet: OK")
+    except Exception as exc:
+        print("greenlet: FAIL ->", exc)
+
+    try:
+        pw_version = metadata.version("playwright")
+        print("playwright (package): OK", pw_version)
+    except Exception as exc:
+        print("playwright (package): FAIL ->", exc)
+
+    try:
+        from playwright.sync_api import sync_playwright  # noqa: F401
+        print("playwright.sync_api: OK")
+    except Exception as exc:
+        print("playwright.sync_api: FAIL ->", exc)
+
+    if os.environ.get("PLAYWRIGHT_BROWSERS_PATH"):
+        browsers_dir = Path(os.environ["PLAYWRIGHT_BROWSERS_PATH"])
+    elif os.name == "nt":
+        browsers_dir = Path(os.environ.get("LOCALAPPDATA", "")) / "ms-playwright"
+    elif sys.platform == "darwin":
+        browsers_dir = Path.home() / "Library" / "Caches" / "ms-playwright"
+    else:
+        browsers_dir = Path.home() / ".cache" / "ms-playwright"
+    print("browsers dir:", browsers_dir, "(exists)" if browsers_dir.exists() else "(missing)")
+
+    if args.perf:
+        print("")
+        return _run_perf(save_baseline=args.save_baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
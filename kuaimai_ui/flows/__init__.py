@@ -2,18 +2,34 @@
 
 from __future__ import annotations
 
-from .km_flow import (
-    FieldSpec,
-    create_fields,
-    create_tables_from_yaml,
-    login,
-    print_playwright_setup_help,
-)
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .km_flow import (
+        FieldSession,
+        FieldSpec,
+        TableResult,
+        create_fields,
+        create_tables_from_yaml,
+        login,
+        print_playwright_setup_help,
+    )
 
 __all__ = [
+    'FieldSession',
     'FieldSpec',
+    'TableResult',
     'create_fields',
     'create_tables_from_yaml',
     'login',
     'print_playwright_setup_help',
 ]
+
+
+def __getattr__(name: str) -> object:
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module('.km_flow', __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+"""注入页面的 DOM 辅助脚本。
+
+km_flow 的热路径（填表名、批量填字段行、检测重复提示）原本每一步都是若干次
+Playwright locator 调用；这里把它们合并成页面内的函数，每次只需一次 evaluate。
+
+脚本通过 add_init_script 注入，之后页面跳转/刷新也会自动存在。
+任何一步失败时调用方会退回原来的 locator 实现，所以这里只做“能快则快”。
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from ..config import setting_flag
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Locator, Page
+
+HELPER_JS = r"""
+(() => {
+  if (window.__km) return;
+
+  // 与 Playwright 的 textbox 角色保持一致：文本类 input 与 textarea，且可见。
+  const TEXT_TYPES = new Set(['', 'text', 'email', 'tel', 'url', 'search']);
+  const isVisible = (el) => {
+    if (!el || !el.isConnected) return false;
+    const style = getComputedStyle(el);
+    if (style.visibility === 'hidden' || style.display === 'none') return false;
+    const rect = el.getBoundingClientRect();
+    return rect.width > 0 || rect.height > 0;
+  };
+  const textboxes = (root) => Array.from(root.querySelectorAll('input, textarea')).filter((el) =>
+    (el.tagName === 'TEXTAREA' || TEXT_TYPES.has((el.getAttribute('type') || '').toLowerCase())) && isVisible(el));
+  const normText = (el) => (el.textContent || '').replace(/\s+/g, ' ').trim();
+  const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+  // 用原生 setter 赋值并派发 input/change，Vue 的 v-model 才能感知到。
+  const setValue = (el, value) => {
+    const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+    el.dispatchEvent(new Event('input', { bubbles: true }));
+    el.dispatchEvent(new Event('change', { bubbles: true }));
+    return el.value === value;
+  };
+
+  const api = {
+    version: 1,
+
+    // 等价于 modal.locator("div").filter(has_text=/^表名$/).get_by_role("textbox").first
+    tableNameInput(modal) {
+      for (const div of modal.querySelectorAll('div')) {
+        if (normText(div) !== '表名') continue;
+        const box = textboxes(div)[0];
+        if (box) return box;
+      }
+      return null;
+    },
+
+    setTableName(modal, name) {
+      const el = api.tableNameInput(modal);
+      return !!el && setValue(el, name);
+    },
+
+    // 输入框顺序：表名 + (字段名, 中文名称, 字段值示例) * N
+    countFieldRows(modal) {
+      return Math.max(0, Math.floor((textboxes(modal).length - 1) / 3));
+    },
+
+    duplicateTip(tips) {
+      const all = document.body.textContent || '';
+      if (!tips.some((tip) => all.includes(tip))) return null;
+      const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+      for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+        const text = node.nodeValue || '';
+        for (const tip of tips) {
+          if (text.includes(tip) && isVisible(node.parentElement)) return tip;
+        }
+      }
+      return null;
+    },
+
+    // 从第 startRow 行开始填写 rows（每项为 [字段名, 中文名称, 示例]），行数不够时先点“增加字段”。
+    async fillRows(modal, startRow, rows, timeoutMs) {
+      const need = 1 + (startRow + rows.length) * 3;
+      let boxes = textboxes(modal);
+      const missing = Math.ceil((need - boxes.length) / 3);
+      if (missing > 0) {
+        const button = Array.from(modal.querySelectorAll('button')).find((b) => normText(b).includes('增加字段'));
+        if (!button) return { filled: 0, reason: '未找到“增加字段”按钮' };
+        for (let i = 0; i < missing; i++) button.click();
+        const deadline = Date.now() + timeoutMs;
+        while ((boxes = textboxes(modal)).length < need) {
+          if (Date.now() > deadline) {
+            return { filled: 0, reason: `等待新行超时：需要 ${need} 个输入框，当前 ${boxes.length} 个` };
+          }
+          await sleep(16);
+        }
+      }
+      for (let r = 0; r < rows.length; r++) {
+        const base = 1 + (startRow + r) * 3;
+        for (let k = 0; k < 3; k++) {
+          if (!setValue(boxes[base + k], rows[r][k])) return { filled: r, reason: `第 ${startRow + r + 1} 行赋值未生效` };
+        }
+      }
+      return { filled: rows.length, reason: '' };
+    },
+  };
+
+  window.__km = api;
+})();
+"""
+
+
+def dom_helpers_enabled() -> bool:
+    return setting_flag("KM_DOM_HELPERS", "USE_DOM_HELPERS", True)
+
+
+def install_dom_helpers(page: "Page") -> None:
+    """注入辅助脚本：之后的页面加载自动注入，当前页面立即生效。"""
+
+    try:
+        page.add_init_script(script=HELPER_JS)
+        page.evaluate(HELPER_JS)
+    except Exception as exc:
+        # 注入失败不影响流程，各调用点会退回 locator 实现。
+        print(f"DOM 辅助脚本注入失败，将使用逐个定位的方式：{exc}")
+
+
+def set_table_name(modal: "Locator", name: str) -> bool:
+    try:
+        return bool(modal.evaluate("(el, name) => !!window.__km && window.__km.setTableName(el, name)", name))
+    except Exception:
+        return False
+
+
+def count_field_rows(modal: "Locator") -> int | None:
+    """弹窗里已有的字段行数；辅助脚本不可用时返回 None。"""
+
+    try:
+        result = modal.evaluate("el => window.__km ? window.__km.countFieldRows(el) : null")
+    except Exception:
+        return None
+    return int(result) if isinstance(result, (int, float)) else None
+
+
+def fill_rows(modal: "Locator", start_row: int, rows: Sequence[tuple[str, str, str]], *, timeout_ms: int) -> int:
+    """一次 evaluate 填完多行，返回成功填写的行数（0 表示需要走原来的实现）。"""
+
+    try:
+        result = modal.evaluate(
+            "(el, a) => window.__km ? window.__km.fillRows(el, a.start, a.rows, a.timeout) : {filled: 0}",
+            {"start": start_row, "rows": [list(r) for r in rows], "timeout": timeout_ms},
+        )
+    except Exception:
+        return 0
+
+    filled = int(result.get("filled") or 0) if isinstance(result, dict) else 0
+    reason = result.get("reason") if isinstance(result, dict) else ""
+    if reason:
+        print(f"批量填写未完成（{reason}），剩余字段逐行填写。")
+    return filled
+
+
+def duplicate_tip(page: "Page", tips: Sequence[str]) -> str | None | bool:
+    """返回可见的重复提示；没有提示返回 None；辅助脚本不可用时返回 False。"""
+
+    try:
+        result = page.evaluate("tips => window.__km ? window.__km.duplicateTip(tips) : false", list(tips))
+    except Exception:
+        return False
+    return result if result is None or isinstance(result, str) else False
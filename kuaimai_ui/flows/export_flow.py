@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""导出应用现有的表与字段（服务器快照）。
+
+优先从字段列表接口的 JSON 响应中解析，拿不到时再读取页面表格。
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ..snapshot import (
+    Snapshot,
+    assign_node_names,
+    load_cached_snapshot,
+    save_snapshot,
+    tables_from_payloads,
+    tables_from_rows,
+)
+from .km_flow import (
+    TableSpec,
+    _first_row_text,
+    _next_page_button,
+    _timeout,
+    _wait_list_changed,
+    dump_table_specs_yaml,
+    get_app_name,
+    load_table_specs_from_yaml,
+    open_field_management,
+    resolve_data_yaml_path,
+    select_app,
+)
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Locator, Page, Response
+
+# 翻页上限，防止分页控件异常时死循环。
+MAX_PAGES = 200
+
+
+def _is_json_api(response: "Response") -> bool:
+    try:
+        if response.request.resource_type not in ("xhr", "fetch"):
+            return False
+        return "json" in (response.headers.get("content-type") or "")
+    except Exception:
+        return False
+
+
+def _read_table_rows(page: "Page") -> list[list[str]]:
+    # 一次 evaluate 读完当前页所有行，避免逐行逐格的协议往返。
+    try:
+        return page.eval_on_selector_all(
+            "tbody tr",
+            "rows => rows.map(r => Array.from(r.querySelectorAll('td')).map(td => td.innerText))",
+        )
+    except Exception:
+        return []
+
+
+def _parse_payloads(responses: "list[Response]") -> list[object]:
+    payloads: list[object] = []
+    for response in responses:
+        try:
+            payloads.append(response.json())
+        except Exception:
+            continue
+    return payloads
+
+
+def _turn_page(page: "Page", button: "Locator") -> None:
+    """点“下一页”并等到新一页真正加载完。
+
+    翻页是单页应用内的请求，networkidle 在点击前就已经达到，不能用来判断新页是否到了。
+    这里等列表接口的响应，再等表格第一行的内容变化（DOM 读取依赖后者）。
+    """
+
+    before = _first_row_text(page)
+    clicked = False
+    try:
+        with page.expect_response(_is_json_api, timeout=_timeout("list")):
+            button.click()
+            clicked = True
+    except Exception:
+        if not clicked:
+            raise
+        # 没等到接口响应（例如接口不是 JSON）：只能依赖表格内容变化。
+    _wait_list_changed(page, before)
+
+
+def fetch_app_tables(page: "Page", *, app_name: str | None = None) -> Snapshot:
+    """打开字段管理、选择应用，翻完所有分页，返回服务器上现有的表与字段。"""
+
+    app_name = get_app_name(app_name)
+    responses: list["Response"] = []
+
+    def _on_response(response: "Response") -> None:
+        if _is_json_api(response):
+            responses.append(response)
+
+    page.on("response", _on_response)
+    dom_rows: list[list[str]] = []
+    use_api: bool | None = None
+    try:
+        # 运行中的会话页面通常已经在字段管理、选好了同一个应用，这时再点菜单、选同一个应用
+        # 不一定会重新请求列表，拿不到接口响应。先刷新页面，保证列表接口重新请求一次。
+        page.reload(wait_until="domcontentloaded", timeout=_timeout("list"))
+        open_field_management(page)
+        loaded = len(responses)
+        select_app(page, app_name)
+
+        try:
+            page.wait_for_load_state("networkidle", timeout=_timeout("list"))
+        except Exception:
+            pass
+        # 选应用触发了新的请求时，之前的响应可能属于刷新后默认显示的其他应用，丢掉；
+        # 没有触发说明应用没变，刷新时加载的就是这个应用的列表。
+        if len(responses) > loaded:
+            del responses[:loaded]
+
+        for _ in range(MAX_PAGES):
+            # 第一页加载完就能判断接口响应是否可用；可用时后续页不再读页面表格。
+            if use_api is None:
+                use_api = bool(tables_from_payloads(_parse_payloads(responses)))
+            if not use_api:
+                dom_rows.extend(_read_table_rows(page))
+
+            button = _next_page_button(page)
+            if button is None:
+                break
+            _turn_page(page, button)
+    finally:
+        page.remove_listener("response", _on_response)
+
+    tables = tables_from_payloads(_parse_payloads(responses)) if use_api else []
+    source = "api"
+    if not tables:
+        tables = tables_from_rows(dom_rows)
+        source = "dom"
+        print("未能从接口响应中识别字段列表，已改为读取页面表格（结果可能不完整）。")
+
+    return Snapshot(app_name=app_name, captured_at=time.time(), source=source, tables=tables)
+
+
+def export_app_snapshot(
+    page: "Page | None",
+    *,
+    app_name: str | None = None,
+    out_path: str | os.PathLike[str] | None = None,
+    max_age_s: float | None = None,
+) -> Snapshot:
+    """导出快照并写成 data.yaml 格式。
+
+    max_age_s：本地缓存不超过该秒数时直接使用缓存（此时 page 可以为 None）。
+    out_path：写出的 YAML 路径；不传则只更新本地缓存。
+    """
+
+    app_name = get_app_name(app_name)
+    snapshot = load_cached_snapshot(app_name, max_age_s=max_age_s) if max_age_s is not None else None
+    if snapshot is None:
+        if page is None:
+            raise RuntimeError(f"没有可用的本地快照：{app_name}，需要打开浏览器重新导出。")
+        snapshot = fetch_app_tables(page, app_name=app_name)
+        cache_file = save_snapshot(snapshot)
+        print(f"已导出 {len(snapshot.tables)} 张表（来源：{snapshot.source}），缓存：{cache_file}")
+    else:
+        print(f"使用本地快照：{app_name}，共 {len(snapshot.tables)} 张表")
+
+    if out_path is not None:
+        try:
+            catalog: list[TableSpec] = load_table_specs_from_yaml(resolve_data_yaml_path())
+        except RuntimeError:
+            catalog = []
+        out = Path(out_path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(dump_table_specs_yaml(assign_node_names(snapshot.tables, catalog)), encoding="utf-8")
+        print(f"已写入：{out}")
+
+    return snapshot
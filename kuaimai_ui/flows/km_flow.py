@@ -12,21 +12,56 @@ from __future__ import annotations
 import os
 import re
 import sys
+import threading
 import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import AbstractContextManager, ExitStack, contextmanager
 from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from .. import settings
+from ..config import setting_flag, setting_value
+from . import dom_helpers
+from ..catalog import dedupe_fields
+from ..credentials import DEFAULT_PASSWORD, DEFAULT_PHONE  # noqa: F401  兼容旧的导入位置
+from ..credentials import (
+    Account,
+    CredentialPool,
+    cached_session_state,
+    default_account,
+    forget_session_state,
+    session_state_path,
+)
+from ..progress import ProgressReporter
+from ..recycler import PageHealth, recycle_mode
+from ..scheduler import get_scheduler
+from ..timeouts import TIMEOUT_MS, AdaptiveTimeouts
 
 if TYPE_CHECKING:
-    from playwright.sync_api import Locator, Page
+    from playwright.sync_api import Browser, Locator, Page
 
 LOGIN_URL = "http://admin.iot.kuaimai.com/login"
-DEFAULT_PHONE = "13826056942"
-DEFAULT_PASSWORD = "666666"
+HOME_URL = "http://admin.iot.kuaimai.com/"
 
-TIMEOUT_MS = int(os.getenv("KM_TIMEOUT_MS", "30000"))
+# 登录页错误提示中出现这些字样时，认为账号被锁定或登录过于频繁，需要更长的等待。
+_LOCKOUT_HINTS = ("锁定", "冻结", "频繁", "稍后")
+
+_TIMEOUTS: AdaptiveTimeouts | None = None
+
+
+def _timeouts() -> AdaptiveTimeouts:
+    """进程内共享的自适应超时统计（首次使用时从缓存加载）。"""
+
+    global _TIMEOUTS
+    if _TIMEOUTS is None:
+        _TIMEOUTS = AdaptiveTimeouts.load()
+    return _TIMEOUTS
+
+
+def _timeout(step: str) -> int:
+    return _timeouts().timeout_ms(step)
 
 
 def _is_navigation_destroy_error(exc: Exception) -> bool:
@@ -120,9 +155,20 @@ def print_playwright_setup_help(details: str) -> None:
     )
 
 
-def login(page: "Page") -> None:
-    phone = os.getenv("KM_PHONE", DEFAULT_PHONE)
-    password = os.getenv("KM_PASSWORD", DEFAULT_PASSWORD)
+class LoginError(RuntimeError):
+    """登录页给出了错误提示。locked 为 True 表示账号被锁定或登录过于频繁。"""
+
+    def __init__(self, message: str, *, locked: bool = False) -> None:
+        super().__init__(message)
+        self.locked = locked
+
+
+def login(page: "Page", account: Account | None = None) -> None:
+    """用账号登录（默认 KM_PHONE / KM_PASSWORD）。登录页提示错误时抛出 LoginError。"""
+
+    account = account or default_account()
+    phone = account.phone
+    password = account.password
 
     page.goto(LOGIN_URL, wait_until="domcontentloaded")
 
@@ -130,7 +176,8 @@ def login(page: "Page") -> None:
     if _safe_count(page, password_tab) > 0:
         password_tab.first.click()
 
-    page.wait_for_selector("input[placeholder='请输入手机号']", timeout=TIMEOUT_MS)
+    with _timeouts().measure("login_form"):
+        page.wait_for_selector("input[placeholder='请输入手机号']", timeout=_timeout("login_form"))
     phone_input = page.locator("input[placeholder='请输入手机号']:visible").first
     password_input = page.locator("input[placeholder='请输入密码']:visible").first
 
@@ -143,7 +190,89 @@ def login(page: "Page") -> None:
     password_input.fill(password)
 
     page.get_by_role("button", name="登录").click()
-    page.wait_for_load_state("networkidle")
+    with _timeouts().measure("login"):
+        page.wait_for_load_state("networkidle", timeout=_timeout("login"))
+
+    error = _login_error_text(page)
+    if error:
+        locked = any(hint in error for hint in _LOCKOUT_HINTS)
+        raise LoginError(f"账号 {account.label} 登录失败：{error}", locked=locked)
+
+
+def _login_error_text(page: "Page") -> str:
+    """仍停留在登录页且有可见的错误提示时返回提示文字。"""
+
+    if "/login" not in page.url:
+        return ""
+    tips = page.locator(".el-message--error:visible, .el-form-item__error:visible, .el-message-box__message:visible")
+    if _safe_count(page, tips) == 0:
+        return ""
+    try:
+        return tips.first.inner_text(timeout=1000).strip()
+    except Exception:
+        return ""
+
+
+def open_account_page(browser: "Browser", account: Account) -> "Page":
+    """为账号新建浏览器上下文并进入后台。
+
+    有未过期的登录状态缓存时直接复用（不用再输入账号密码），否则登录后写入缓存。
+    返回的页面所在上下文由调用方关闭（page.context.close()）。
+    """
+
+    state = cached_session_state(account)
+    if state is not None:
+        context = browser.new_context(storage_state=str(state))
+        page = context.new_page()
+        try:
+            page.goto(HOME_URL, wait_until="domcontentloaded")
+            with _timeouts().measure("login"):
+                page.wait_for_load_state("networkidle", timeout=_timeout("login"))
+        except BaseException:
+            context.close()
+            raise
+        if "/login" not in page.url:
+            return page
+        print(f"账号 {account.label} 的登录状态已失效，重新登录")
+        context.close()
+        forget_session_state(account)
+
+    context = browser.new_context()
+    page = context.new_page()
+    try:
+        login(page, account)
+        context.storage_state(path=str(session_state_path(account)))
+    except BaseException:
+        context.close()
+        raise
+    return page
+
+
+@contextmanager
+def leased_account_page(browser: "Browser", pool: CredentialPool, *, prefer: int = 0) -> Iterator[tuple["Page", Account]]:
+    """从账号池借一个账号并打开已登录的页面，退出时关闭上下文、归还账号。
+
+    登录失败的账号由账号池暂停分配（被锁定时暂停更久），然后换下一个账号重试。
+    """
+
+    attempts = 0
+    while True:
+        with pool.lease(prefer=prefer) as account:
+            try:
+                page = open_account_page(browser, account)
+            except LoginError as exc:
+                print(str(exc), file=sys.stderr)
+                pool.report_failure(account, locked=exc.locked)
+                attempts += 1
+                if attempts >= 2 * len(pool.accounts):
+                    raise
+                continue
+            pool.report_success(account)
+            try:
+                yield page, account
+            finally:
+                page.context.close()
+            return
 
 
 def _click_menu(page: "Page", menu_text: str) -> None:
@@ -166,7 +295,8 @@ def open_field_management(page: "Page") -> None:
     _click_menu(page, "模板管理")
     _click_menu(page, "字段管理")
 
-    page.get_by_role("button", name="新建字段").wait_for(state="visible", timeout=TIMEOUT_MS)
+    with _timeouts().measure("menu"):
+        page.get_by_role("button", name="新建字段").wait_for(state="visible", timeout=_timeout("menu"))
 
 
 def select_app(page: "Page", app_name: str) -> None:
@@ -182,7 +312,8 @@ def get_data_table_modal(page: "Page") -> "Locator":
     modal = page.get_by_label("数据表管理")
     if _safe_count(page, modal) == 0:
         modal = page.get_by_role("dialog").filter(has_text=re.compile(r"数据表管理"))
-    modal.first.wait_for(state="visible", timeout=TIMEOUT_MS)
+    with _timeouts().measure("modal"):
+        modal.first.wait_for(state="visible", timeout=_timeout("modal"))
     return modal.first
 
 
@@ -229,6 +360,47 @@ def load_table_specs_from_yaml(yaml_path: Path) -> list[TableSpec]:
     return result
 
 
+def _drop_duplicate_fields(tables: list[TableSpec]) -> list[TableSpec]:
+    """运行前去掉表内完全相同的重复字段和空字段，避免填完整张表后才被服务器以“字段名不能重复”拒绝。
+
+    只差全角/半角的写法不在这里去掉（可能是两个不同的字段），由 check 提示。
+    """
+
+    result: list[TableSpec] = []
+    owners: dict[str, str] = {}
+    for table in tables:
+        kept, dropped = dedupe_fields(table.fields, exact=True)
+        if dropped:
+            print(
+                f"数据文件中 {table.name} 有重复或空的字段，已忽略：{'、'.join(dropped)}"
+                "（可运行 python -m kuaimai_ui check --fix 修复数据文件）",
+                file=sys.stderr,
+            )
+            table = TableSpec(name=table.name, table_name=table.table_name, fields=kept)
+        owner = owners.setdefault(table.table_name.strip(), table.name)
+        if owner != table.name:
+            print(f"数据文件中 {table.name} 的 table_name 与 {owner} 相同，服务器会按重名跳过", file=sys.stderr)
+        result.append(table)
+    return result
+
+
+def dump_table_specs_yaml(tables: list[TableSpec]) -> str:
+    """按 data/data.yaml 的书写格式输出（双引号字符串、两空格缩进、表之间空一行）。"""
+
+    import json
+
+    blocks: list[str] = []
+    for table in tables:
+        lines = [f"{table.name}:", f"  table_name: {json.dumps(table.table_name, ensure_ascii=False)}"]
+        if table.fields:
+            lines.append("  fields:")
+            lines.extend(f"    - {json.dumps(value, ensure_ascii=False)}" for value in table.fields)
+        else:
+            lines.append("  fields: []")
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks) + "\n"
+
+
 def _get_table_name_input(modal: "Locator") -> "Locator":
     return (
         modal.locator("div")
@@ -252,9 +424,10 @@ def _fill_field_row_triplet(modal: "Locator", row_index: int, *, field_name: str
     base = 1 + row_index * 3
 
     try:
-        textboxes.nth(base).wait_for(state="visible", timeout=TIMEOUT_MS)
-        textboxes.nth(base + 1).wait_for(state="visible", timeout=TIMEOUT_MS)
-        textboxes.nth(base + 2).wait_for(state="visible", timeout=TIMEOUT_MS)
+        with _timeouts().measure("textbox"):
+            textboxes.nth(base).wait_for(state="visible", timeout=_timeout("textbox"))
+            textboxes.nth(base + 1).wait_for(state="visible", timeout=_timeout("textbox"))
+            textboxes.nth(base + 2).wait_for(state="visible", timeout=_timeout("textbox"))
 
         textboxes.nth(base).fill(field_name)
         textboxes.nth(base + 1).fill(cn_name)
@@ -300,6 +473,11 @@ def _locator_visible(locator: "Locator") -> bool:
 
 
 def _find_duplicate_tip(page: "Page", modal: "Locator") -> str | None:
+    if dom_helpers.dom_helpers_enabled():
+        tip = dom_helpers.duplicate_tip(page, _DUPLICATE_TIPS)
+        if tip is not False:
+            return tip
+
     for tip in _DUPLICATE_TIPS:
         if _locator_visible(modal.get_by_text(tip, exact=False)):
             return tip
@@ -328,12 +506,12 @@ def _dismiss_alert_like(page: "Page", tip: str) -> None:
 
 def _click_cancel(modal: "Locator", page: "Page") -> None:
     try:
-        modal.get_by_role("button", name="取消").click(timeout=TIMEOUT_MS)
+        modal.get_by_role("button", name="取消").click(timeout=_timeout("cancel"))
         return
     except Exception:
         pass
 
-    page.get_by_role("button", name="取消").first.click(timeout=TIMEOUT_MS)
+    page.get_by_role("button", name="取消").first.click(timeout=_timeout("cancel"))
 
 
 def _save_modal_or_cancel_on_duplicate(page: "Page", modal: "Locator") -> bool:
@@ -341,74 +519,458 @@ def _save_modal_or_cancel_on_duplicate(page: "Page", modal: "Locator") -> bool:
     # - 成功：弹窗关闭，返回 True
     # - 表名/字段名重复：点击取消关闭弹窗，返回 False
 
-    modal.get_by_role("button", name="保存").click()
-
-    deadline = time.monotonic() + TIMEOUT_MS / 1000
-    while time.monotonic() < deadline:
-        try:
-            if not modal.is_visible():
+    # 保存是对后台的写操作，统一经过调度器限速；耗时与是否超时会反馈给调度器。
+    with get_scheduler().save_slot():
+        modal.get_by_role("button", name="保存").click()
+
+        start = time.monotonic()
+        deadline = start + _timeout("save") / 1000
+        while time.monotonic() < deadline:
+            try:
+                if not modal.is_visible():
+                    _timeouts().record("save", time.monotonic() - start)
+                    return True
+            except Exception:
                 return True
-        except Exception:
-            return True
-
-        tip = _find_duplicate_tip(page, modal)
-        if tip:
-            print(f"检测到提示“{tip}”，将取消本次新增并跳过。")
-            _dismiss_alert_like(page, tip)
-            _click_cancel(modal, page)
-            modal.wait_for(state="hidden", timeout=TIMEOUT_MS)
-            return False
 
-        page.wait_for_timeout(200)
+            tip = _find_duplicate_tip(page, modal)
+            if tip:
+                print(f"检测到提示“{tip}”，将取消本次新增并跳过。")
+                _dismiss_alert_like(page, tip)
+                _click_cancel(modal, page)
+                with _timeouts().measure("cancel"):
+                    modal.wait_for(state="hidden", timeout=_timeout("cancel"))
+                return False
 
-    raise RuntimeError("点击“保存”后等待超时：弹窗未关闭且未检测到重复提示。")
+            page.wait_for_timeout(200)
 
+        raise RuntimeError(
+            f"点击“保存”后等待 {_timeout('save')} 毫秒超时：弹窗未关闭且未检测到重复提示。"
+        )
+
+
+def _create_one_table(
+    page: "Page",
+    *,
+    table_name: str,
+    field_values: "list[str] | list[FieldSpec]",
+    progress: ProgressReporter | None = None,
+    worker: str = "main",
+) -> bool:
+    """在已打开的字段管理页新建一张表。返回 False 表示表名/字段名重复已跳过。
+
+    field_values 为字符串时，字段名/中文名称/示例都用同一个值（YAML 流程）；
+    为 FieldSpec 时分别填写。
+    """
 
-def _create_one_table(page: "Page", *, table_name: str, field_values: list[str]) -> bool:
     page.get_by_role("button", name="新建字段").click()
 
     modal = get_data_table_modal(page)
 
-    table_input = _get_table_name_input(modal)
-    table_input.click()
-    table_input.fill(table_name)
+    if not (dom_helpers.dom_helpers_enabled() and dom_helpers.set_table_name(modal, table_name)):
+        table_input = _get_table_name_input(modal)
+        table_input.click()
+        table_input.fill(table_name)
+
+    _fill_rows(modal, table_name, field_values, progress=progress, worker=worker)
+
+    saved = _save_modal_or_cancel_on_duplicate(page, modal)
+
+    with _timeouts().measure("modal_close"):
+        page.get_by_role("button", name="新建字段").wait_for(state="visible", timeout=_timeout("modal_close"))
+    return saved
+
+
+def _fill_rows(
+    modal: "Locator",
+    table_name: str,
+    field_values: "list[str] | list[FieldSpec]",
+    *,
+    first_row: int = 0,
+    progress: ProgressReporter | None = None,
+    worker: str = "main",
+) -> None:
+    """从第 first_row 行开始填写字段；第 1 行以外的每一行都先点“增加字段”。
+
+    启用 DOM 辅助脚本时一次 evaluate 填完所有行，未完成的部分再逐行填写。
+    """
 
-    for idx, value in enumerate(field_values):
-        if idx > 0:
+    rows = [
+        (v.field_name, v.cn_name, v.example) if isinstance(v, FieldSpec) else (v, v, v)
+        for v in field_values
+    ]
+
+    done = 0
+    fast = dom_helpers.dom_helpers_enabled()
+    if fast and rows:
+        with _timeouts().measure("fill_rows"):
+            done = dom_helpers.fill_rows(modal, first_row, rows, timeout_ms=_timeout("fill_rows"))
+        if done and progress is not None:
+            progress.field_done(table_name, worker=worker, count=done)
+
+    textboxes = modal.get_by_role("textbox")
+    for offset, value in enumerate(field_values[done:], start=done):
+        idx = first_row + offset
+        # 批量填写可能已经加出了新行，这种情况下不再重复点击。
+        if idx > 0 and not (fast and textboxes.count() >= 1 + (idx + 1) * 3):
             modal.get_by_role("button").filter(has_text=re.compile(r"增加字段")).first.click()
 
-        _fill_field_row_value(modal, idx, value)
+        if isinstance(value, FieldSpec):
+            _fill_field_row_spec(modal, idx, value)
+        else:
+            _fill_field_row_value(modal, idx, value)
+        if progress is not None:
+            progress.field_done(table_name, worker=worker)
+
+
+# 字段列表的分页控件（Element UI / Ant Design）。
+_NEXT_PAGE = ".el-pagination .btn-next, .ant-pagination-next"
+_FIRST_PAGE = ".el-pagination .el-pager li.number, .ant-pagination-item"
+
+# 列表第一行的文字，用于判断翻页后表格内容是否已经刷新。
+_FIRST_ROW_JS = "() => { const r = document.querySelector('tbody tr'); return r ? r.innerText : ''; }"
+
+
+def _next_page_button(page: "Page") -> "Locator | None":
+    """可点击的“下一页”按钮；没有分页或已是最后一页时返回 None。"""
+
+    button = page.locator(_NEXT_PAGE)
+    if _safe_count(page, button) == 0:
+        return None
+    button = button.first
+    try:
+        if button.is_disabled() or "disabled" in (button.get_attribute("class") or ""):
+            return None
+    except Exception:
+        return None
+    return button
+
+
+def _first_row_text(page: "Page") -> str:
+    try:
+        return str(page.evaluate(_FIRST_ROW_JS))
+    except Exception:
+        return ""
+
+
+def _wait_list_changed(page: "Page", before: str) -> None:
+    """翻页是页面内请求，networkidle 早已达到，改为等列表第一行的内容变化。"""
+
+    try:
+        page.wait_for_function(
+            f"prev => ({_FIRST_ROW_JS})() !== prev", arg=before, timeout=_timeout("list")
+        )
+    except Exception:
+        # 内容恰好相同或超时：继续，由调用方按读到的内容判断。
+        pass
+
+
+def _goto_first_list_page(page: "Page") -> None:
+    first = page.locator(_FIRST_PAGE)
+    if _safe_count(page, first) == 0:
+        return
+    first = first.first
+    try:
+        cls = first.get_attribute("class") or ""
+    except Exception:
+        return
+    if "active" in cls:
+        return
+    before = _first_row_text(page)
+    first.click()
+    _wait_list_changed(page, before)
+
+
+def _find_table_row(page: "Page", table_name: str) -> "Locator | None":
+    """从第一页开始逐页查找表名完全相同的行（不会把“订单”匹配到“订单子表”）。"""
+
+    exact = re.compile(rf"^\s*{re.escape(table_name)}\s*$")
+    _goto_first_list_page(page)
+    for _ in range(200):
+        row = page.get_by_role("row").filter(has=page.get_by_role("cell", name=exact))
+        if _safe_count(page, row) > 0:
+            return row.first
+        button = _next_page_button(page)
+        if button is None:
+            return None
+        before = _first_row_text(page)
+        button.click()
+        _wait_list_changed(page, before)
+    return None
+
+
+def _append_fields_to_table(
+    page: "Page",
+    *,
+    table_name: str,
+    field_values: "list[str] | list[FieldSpec]",
+    progress: ProgressReporter | None = None,
+    worker: str = "main",
+) -> bool:
+    """给已存在的表追加字段：在列表中找到该表，点“编辑”，在已有行之后新增行并保存。
+
+    返回 False 表示字段名重复（字段已存在）已跳过。
+    列表页/编辑弹窗结构如有调整，请用 Playwright Inspector 重新录制并同步这里的定位。
+    """
+
+    row = _find_table_row(page, table_name)
+    if row is None:
+        raise RuntimeError(f"字段列表中未找到表“{table_name}”，无法追加字段，请手动处理。")
+
+    row.get_by_text("编辑", exact=True).first.click()
+    modal = get_data_table_modal(page)
+
+    textboxes = modal.get_by_role("textbox")
+    with _timeouts().measure("textbox"):
+        textboxes.first.wait_for(state="visible", timeout=_timeout("textbox"))
+    existing_rows = dom_helpers.count_field_rows(modal) if dom_helpers.dom_helpers_enabled() else None
+    if existing_rows is None:
+        existing_rows = max(0, (textboxes.count() - 1) // 3)
+
+    _fill_rows(modal, table_name, field_values, first_row=existing_rows, progress=progress, worker=worker)
 
     saved = _save_modal_or_cancel_on_duplicate(page, modal)
 
-    page.get_by_role("button", name="新建字段").wait_for(state="visible", timeout=TIMEOUT_MS)
+    with _timeouts().measure("modal_close"):
+        page.get_by_role("button", name="新建字段").wait_for(state="visible", timeout=_timeout("modal_close"))
     return saved
 
-def create_fields(page: "Page", *, app_name: str, table_name: str, fields: list[FieldSpec]) -> None:
-    if not fields:
-        raise ValueError("fields 不能为空")
+
+def _recover_to_field_list(page: "Page", app_name: str) -> None:
+    """单张表失败后尽量回到字段列表页，便于继续处理下一张表。"""
+
+    try:
+        modal = page.get_by_role("dialog").filter(has_text=re.compile(r"数据表管理"))
+        if _locator_visible(modal):
+            _click_cancel(modal.first, page)
+            modal.first.wait_for(state="hidden", timeout=_timeout("cancel"))
+    except Exception:
+        pass
+
+    if _locator_visible(page.get_by_role("button", name="新建字段")):
+        return
 
     open_field_management(page)
     select_app(page, app_name)
 
-    page.get_by_role("button", name="新建字段").click()
-    modal = get_data_table_modal(page)
 
-    table_input = _get_table_name_input(modal)
-    table_input.click()
-    table_input.fill(table_name)
+@dataclass(frozen=True)
+class TableResult:
+    """单张表的处理结果。
 
-    for idx, field in enumerate(fields):
-        if idx > 0:
-            modal.get_by_role("button").filter(has_text=re.compile(r"增加字段")).first.click()
+    status：created（已新建）/ appended（已追加字段）/ duplicate（表名或字段名重复，已跳过）/
+    unchanged（与上次同步一致，未处理）/ empty（没有字段，已跳过）/ failed（出错）
+    """
 
-        _fill_field_row_spec(modal, idx, field)
+    table_name: str
+    status: str
+    field_count: int
+    duration_s: float = 0.0
+    error: str = ""
 
-    saved = _save_modal_or_cancel_on_duplicate(page, modal)
-    if not saved:
-        raise RuntimeError("保存失败：表名或字段名重复，请修改后重试。")
+    @property
+    def ok(self) -> bool:
+        return self.status in ("created", "appended")
 
 
+class FieldSession:
+    """批量新建字段的会话。
+
+    进入时只打开一次“字段管理”并选择一次应用，之后可连续新建多张表：
+
+        with FieldSession(page, app_name="测试应用") as session:
+            results = session.create_many([("订单主表", [FieldSpec(...), ...]), ...])
+
+    重复的表不会抛异常，而是记为 duplicate 并继续。
+    stop_on_error=True 时其他错误直接抛出；否则记为 failed，回到列表页后继续。
+    account：登录所用账号（手机号或 Account），会话期间占用该账号的一个并发名额（见 scheduler）。
+    worker：多个会话共用一个 ProgressReporter 时区分各自的进度。
+
+    长时间运行时会跟踪页面内存与每张表耗时，超过阈值就在两张表之间回收页面
+    （settings.RECYCLE_MODE），之后请使用 session.page 而不是最初传入的 page。
+    """
+
+    def __init__(
+        self,
+        page: "Page",
+        *,
+        app_name: str | None = None,
+        progress: ProgressReporter | None = None,
+        stop_on_error: bool = False,
+        account: str | Account | None = None,
+        worker: str = "main",
+    ) -> None:
+        self.page = page
+        self.app_name = get_app_name(app_name)
+        if isinstance(account, Account):
+            self.account = account.phone
+            self._session_limit = account.max_sessions
+        else:
+            self.account = account or default_account().phone
+            self._session_limit = None
+        self.worker = worker
+        self._slot = ExitStack()
+        self.stop_on_error = stop_on_error
+        self.results: list[TableResult] = []
+        self._own_progress = progress is None
+        self._progress = progress if progress is not None else ProgressReporter()
+        self._health = PageHealth(page) if recycle_mode() != "off" else None
+        self._owned_contexts: list[object] = []
+
+    def __enter__(self) -> "FieldSession":
+        self._slot.enter_context(get_scheduler().session(self.account, limit=self._session_limit))
+        try:
+            self._prepare_page()
+        except BaseException:
+            self._slot.close()
+            raise
+        return self
+
+    def _prepare_page(self) -> None:
+        if dom_helpers.dom_helpers_enabled():
+            dom_helpers.install_dom_helpers(self.page)
+        open_field_management(self.page)
+        select_app(self.page, self.app_name)
+
+    def recycle(self, reason: str) -> None:
+        """换一个新页面（或新上下文）继续：沿用登录状态，重新打开字段管理并选择应用。"""
+
+        old = self.page
+        old_context = old.context
+        mode = recycle_mode()
+        browser = old_context.browser if mode == "context" else None
+        print(f"回收页面（{reason}），重新打开字段管理……")
+
+        url = old.url
+        if browser is not None:
+            # 新上下文只带 cookie/localStorage；如果登录态存在 sessionStorage 里请使用 page 模式。
+            context = browser.new_context(storage_state=old_context.storage_state())
+            self._owned_contexts.append(context)
+            new_page = context.new_page()
+        else:
+            new_page = old_context.new_page()
+
+        old.close()
+        if old_context in self._owned_contexts and old_context is not new_page.context:
+            self._owned_contexts.remove(old_context)
+            old_context.close()
+
+        self.page = new_page
+        new_page.goto(url, wait_until="domcontentloaded")
+        self._prepare_page()
+        if self._health is not None:
+            self._health.reset(new_page)
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._own_progress:
+            self._progress.close()
+            self._own_progress = False
+        _timeouts().save()
+        # 当前页面所在的上下文留给调用方继续使用（例如 PAUSE_AFTER_RUN），随浏览器一起关闭。
+        current = None if self.page.is_closed() else self.page.context
+        for context in self._owned_contexts:
+            if context is current:
+                continue
+            try:
+                context.close()
+            except Exception:
+                pass
+        self._owned_contexts.clear()
+        self._slot.close()
+
+    def plan(self, tables: "list[tuple[str, list[FieldSpec] | list[str]]]") -> None:
+        """预先登记工作量，进度条从一开始就能给出总数与剩余时间。"""
+
+        work = [fields for _, fields in tables if fields]
+        self._progress.plan(tables=len(work), fields=sum(len(f) for f in work))
+
+    def create(self, table_name: str, fields: "list[FieldSpec] | list[str]") -> TableResult:
+        return self._run(table_name, fields, append=False)
+
+    def append(self, table_name: str, fields: "list[FieldSpec] | list[str]") -> TableResult:
+        """给已存在的表追加字段（只传新增的字段）。"""
+
+        return self._run(table_name, fields, append=True)
+
+    def _run(self, table_name: str, fields: "list[FieldSpec] | list[str]", *, append: bool) -> TableResult:
+        if not fields:
+            print(f"跳过空字段表：{table_name}")
+            result = TableResult(table_name=table_name, status="empty", field_count=0)
+            self.results.append(result)
+            return result
+
+        if not self._progress.take_planned():
+            self._progress.add_work(tables=1, fields=len(fields))
+
+        progress = self._progress
+        worker = self.worker
+        progress.start_table(table_name, len(fields), worker=worker)
+        throttled_before = get_scheduler().throttled_s()
+        start = time.monotonic()
+        done_before = progress.worker_fields.get(worker, 0)
+        status = "failed"
+        error = ""
+        try:
+            action = _append_fields_to_table if append else _create_one_table
+            saved = action(self.page, table_name=table_name, field_values=fields, progress=progress, worker=worker)
+            if not saved:
+                status = "duplicate"
+            else:
+                status = "appended" if append else "created"
+        except Exception as exc:
+            error = str(exc) or exc.__class__.__name__
+            if self.stop_on_error:
+                raise
+            print(f"处理失败：{table_name}，{error.splitlines()[0]}", file=sys.stderr)
+            _recover_to_field_list(self.page, self.app_name)
+        finally:
+            filled = progress.worker_fields.get(worker, 0) - done_before
+            progress.table_done(
+                table_name,
+                ok=status in ("created", "appended"),
+                worker=worker,
+                skipped_fields=max(0, len(fields) - filled),
+            )
+            result = TableResult(
+                table_name=table_name,
+                status=status,
+                field_count=len(fields),
+                duration_s=time.monotonic() - start,
+                error=error,
+            )
+            self.results.append(result)
+
+        if self._health is not None:
+            # 去掉保存限速的等待：调度器降速不是页面变慢，回收页面也没用。
+            throttled = get_scheduler().throttled_s() - throttled_before
+            self._health.record_table(max(0.0, result.duration_s - throttled), result.field_count)
+            reason = self._health.should_recycle()
+            if reason:
+                self.recycle(reason)
+
+        return result
+
+    def create_many(self, tables: "Iterable[tuple[str, list[FieldSpec] | list[str]]]") -> list[TableResult]:
+        """依次新建多张表；传入列表时会先登记总工作量。"""
+
+        if isinstance(tables, list):
+            self.plan(tables)
+        return [self.create(table_name, fields) for table_name, fields in tables]
+
+
+def create_fields(page: "Page", *, app_name: str, table_name: str, fields: list[FieldSpec]) -> None:
+    if not fields:
+        raise ValueError("fields 不能为空")
+
+    with FieldSession(page, app_name=app_name, stop_on_error=True) as session:
+        result = session.create(table_name, fields)
+
+    if result.status == "duplicate":
+        raise RuntimeError("保存失败：表名或字段名重复，请修改后重试。")
+
 
 def _format_duration(seconds: float) -> str:
     seconds = float(seconds)
@@ -424,38 +986,230 @@ def _format_duration(seconds: float) -> str:
     return f"{minutes} 分 {remain:.2f} 秒"
 
 
-def create_tables_from_yaml(page: "Page", *, app_name: str | None = None, yaml_path: str | os.PathLike[str] | None = None) -> None:
-    app_name = get_app_name(app_name)
-    if yaml_path is None:
-        cfg_path = getattr(settings, 'DATA_YAML_PATH', '')
-        env_path = os.getenv('KM_DATA_YAML')
-        raw = env_path or cfg_path
-        yaml_file = Path(raw) if raw else _default_data_yaml_path()
-    else:
-        yaml_file = Path(yaml_path)
+def resolve_data_yaml_path(yaml_path: str | os.PathLike[str] | None = None) -> Path:
+    """数据文件路径：传参 > 环境变量 KM_DATA_YAML > settings.DATA_YAML_PATH > 默认路径。"""
 
-    tables = load_table_specs_from_yaml(yaml_file)
-    start = time.monotonic()
+    if yaml_path is not None:
+        return Path(yaml_path)
 
-    print(f"开始根据 YAML 新建字段，共 {len(tables)} 张表")
+    cfg_path = getattr(settings, 'DATA_YAML_PATH', '')
+    env_path = os.getenv('KM_DATA_YAML')
+    raw = env_path or cfg_path
+    return Path(raw) if raw else _default_data_yaml_path()
 
-    open_field_management(page)
-    select_app(page, app_name)
 
-    success = 0
-    skipped = 0
+def _resolve_run_flags(incremental: bool | None, verify: bool | None) -> tuple[bool, bool]:
+    """实际生效的（增量同步, 保存后核对）：未指定时读取环境变量与 settings。"""
 
-    for table in tables:
-        if not table.fields:
-            print(f"跳过空字段表：{table.table_name}")
-            skipped += 1
-            continue
-
-        print(f"正在处理：{table.table_name}，字段数 {len(table.fields)}")
-        ok = _create_one_table(page, table_name=table.table_name, field_values=table.fields)
-        if ok:
-            success += 1
-        else:
-            skipped += 1
+    if incremental is None:
+        incremental = setting_flag("KM_INCREMENTAL", "INCREMENTAL_SYNC", False)
+    if verify is None:
+        verify = setting_flag("KM_VERIFY", "VERIFY_AFTER_RUN", False)
+    return incremental, verify
+
+
+def _sync_action(result: TableResult, *, verify: bool) -> str | None:
+    """一张表处理完后同步清单怎么处理："mark" 直接记为已同步，"verify" 等核对通过后再记，None 不记。
+
+    duplicate 可能是“字段名不能重复”导致整次保存被拒绝（追加时有一个字段已存在，其他新字段也没保存），
+    不能直接记为已同步，否则下次运行认为未变化、再也不会重试；开启核对时按服务器列表确认。
+    """
 
-    print(f"所有表处理完成：成功 {success}，跳过 {skipped}，耗时 {_format_duration(time.monotonic() - start)}")
+    if result.ok:
+        return "verify" if verify else "mark"
+    if result.status == "duplicate" and verify:
+        return "verify"
+    return None
+
+
+def create_tables_from_yaml(
+    page: "Page",
+    *,
+    app_name: str | None = None,
+    yaml_path: str | os.PathLike[str] | None = None,
+    progress: ProgressReporter | None = None,
+    incremental: bool | None = None,
+    verify: bool | None = None,
+    account: Account | None = None,
+    workers: int = 1,
+    open_worker: "Callable[[int], AbstractContextManager[tuple[Page, Account]]] | None" = None,
+    results: "list[TableResult] | None" = None,
+) -> list[TableResult]:
+    """根据 YAML 批量新建表与字段，返回每张表的处理结果。
+
+    progress：可传入共享的 ProgressReporter（多应用/多 worker 汇总进度）；
+    不传时内部创建一个，运行结束后关闭。
+    incremental：只处理与上次同步相比新增/有变化的表（默认读取 settings.INCREMENTAL_SYNC）。
+    verify：保存后批量核对服务器上的表/字段（默认读取 settings.VERIFY_AFTER_RUN）。
+    account：page 登录所用的账号。
+    workers / open_worker：workers > 1 时另外启动 workers - 1 个线程，每个线程调用
+    open_worker(序号) 得到自己的（已登录页面, 账号），与 page 一起从同一个队列取表。
+    Playwright 的同步 API 不能跨线程使用，open_worker 需要在线程内自行启动浏览器（见 runner）。
+    results：传入列表时每张表的结果边处理边追加进去，运行中途出错时调用方仍能拿到已完成的部分。
+    """
+
+    from ..manifest import Manifest
+    from .verify_flow import verify_submitted
+
+    incremental, verify = _resolve_run_flags(incremental, verify)
+    verify_every = setting_value("KM_VERIFY_EVERY", "VERIFY_EVERY_N_TABLES", 0)
+    repair = setting_flag("KM_VERIFY_REPAIR", "VERIFY_REPAIR", False)
+
+    app_name = get_app_name(app_name)
+    yaml_file = resolve_data_yaml_path(yaml_path)
+
+    tables = _drop_duplicate_fields(load_table_specs_from_yaml(yaml_file))
+    start = time.monotonic()
+
+    manifest = Manifest.load()
+    if incremental:
+        plan = manifest.plan(app_name, tables)
+        print(f"开始增量同步，共 {len(tables)} 张表：{plan.summary()}")
+        for table in plan.relabel:
+            manifest.mark_synced(app_name, table)
+        creates = plan.new + plan.empty
+        appends = plan.changed
+        unchanged = plan.unchanged + plan.relabel
+    else:
+        print(f"开始根据 YAML 新建字段，共 {len(tables)} 张表")
+        creates = tables
+        appends = []
+        unchanged = []
+
+    # 字段多的表先处理（见 scheduler），最后不会剩大表拖尾。多个 worker 时才限制保存频率。
+    scheduler = get_scheduler(threads=workers if open_worker is not None else 1)
+    creates = scheduler.order(creates, size=lambda t: len(t.fields))
+    appends = scheduler.order(appends, size=lambda item: len(item[1]))
+
+    by_name = {t.table_name: t for t in tables}
+    if results is None:
+        results = []
+    results.extend(
+        TableResult(table_name=t.table_name, status="unchanged", field_count=len(t.fields)) for t in unchanged
+    )
+
+    # 待处理队列：(表, 字段, 是否追加)。多个 worker 共用，按上面的顺序取。
+    jobs: deque[tuple[TableSpec, list[str], bool]] = deque(
+        [(t, t.fields, False) for t in creates] + [(t, added, True) for t, added in appends]
+    )
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    # 已提交、等待核对的表（核对通过前不算真正同步）。
+    pending: list[TableSpec] = []
+    # 保存成功（created/appended）的表名；无法核对时按保存结果记为已同步。
+    saved_ok: set[str] = set()
+
+    def _record(result: TableResult) -> None:
+        table = by_name[result.table_name]
+        action = _sync_action(result, verify=verify)
+        if result.ok:
+            saved_ok.add(result.table_name)
+        if action == "verify":
+            pending.append(table)
+        elif action == "mark":
+            manifest.mark_synced(app_name, table)
+
+    def _verify_pending(session: FieldSession) -> None:
+        with lock:
+            batch = list(pending)
+            pending.clear()
+        if not batch:
+            return
+        try:
+            report = verify_submitted(session, batch, repair=repair)
+        except Exception as exc:
+            # 核对失败不影响已完成的新建，只是这些表不记为已同步，下次会再处理。
+            print(f"保存后核对失败：{exc}", file=sys.stderr)
+            return
+        if report.unverifiable:
+            # 无法核对时退回按保存结果判断：保存成功的表记为已同步（否则每次增量运行都会变成全量重跑），
+            # 按重复跳过的表仍不记，下次再处理。
+            trusted = [t for t in batch if t.table_name in saved_ok]
+            with lock:
+                for table in trusted:
+                    manifest.mark_synced(app_name, table)
+            if trusted:
+                print(f"无法核对，已按保存结果把 {len(trusted)} 张保存成功的表记为已同步。", file=sys.stderr)
+            return
+        unresolved = set(report.unresolved)
+        with lock:
+            for table in batch:
+                if table.table_name not in unresolved:
+                    manifest.mark_synced(app_name, table)
+
+    def _drain(page: "Page", account: Account | None, worker: str) -> None:
+        with FieldSession(
+            page, app_name=app_name, progress=shared, stop_on_error=True, account=account, worker=worker
+        ) as session:
+            try:
+                while not stop.is_set():
+                    with lock:
+                        if not jobs:
+                            break
+                        table, fields, append = jobs.popleft()
+                    done_before = len(session.results)
+                    try:
+                        if append:
+                            print(f"追加字段：{table.table_name}，新增 {len(fields)} 个")
+                            session.append(table.table_name, fields)
+                        else:
+                            session.create(table.table_name, fields)
+                    finally:
+                        # stop_on_error 时出错的表不会返回结果而是直接抛出，从 session.results 里取，
+                        # 这样失败的那张表也会出现在结果（和运行历史）里。
+                        with lock:
+                            for result in session.results[done_before:]:
+                                _record(result)
+                                results.append(result)
+                            due = bool(verify_every) and len(pending) >= verify_every
+                    if due:
+                        _verify_pending(session)
+            except BaseException:
+                # 其他 worker 处理完手上的表后停止。
+                stop.set()
+                raise
+            _verify_pending(session)
+
+    errors: list[BaseException] = []
+
+    def _worker_main(index: int) -> None:
+        assert open_worker is not None
+        try:
+            with open_worker(index) as (worker_page, worker_account):
+                _drain(worker_page, worker_account, f"w{index}")
+        except BaseException as exc:
+            stop.set()
+            errors.append(exc)
+
+    own_progress = progress is None
+    shared = progress if progress is not None else ProgressReporter()
+    extra = max(0, min(workers, len(jobs)) - 1) if open_worker is not None else 0
+    threads = [threading.Thread(target=_worker_main, args=(i,), name=f"km-worker-{i}") for i in range(1, extra + 1)]
+    try:
+        if jobs:
+            shared.plan(tables=len([j for j in jobs if j[1]]), fields=sum(len(j[1]) for j in jobs))
+            if threads:
+                print(f"使用 {extra + 1} 个 worker 并行处理")
+            for thread in threads:
+                thread.start()
+            try:
+                _drain(page, account, "main")
+            finally:
+                for thread in threads:
+                    thread.join()
+            if errors:
+                raise errors[0]
+    finally:
+        manifest.save()
+        if own_progress:
+            shared.close()
+
+    success = sum(1 for r in results if r.ok)
+    skipped = sum(1 for r in results if r.status in ("duplicate", "empty"))
+    untouched = len(results) - success - skipped
+    print(
+        f"所有表处理完成：成功 {success}，跳过 {skipped}，未变化 {untouched}，"
+        f"耗时 {_format_duration(time.monotonic() - start)}"
+    )
+    return results
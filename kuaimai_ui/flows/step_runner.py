@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+"""执行 tools/compile_recording.py 生成的步骤列表。
+
+录制代码里的固定等待和 slow_mo 依赖都已去掉：每一步直接调用 Playwright 的动作，
+由其自动等待元素可操作，超时使用按步骤自适应的超时（见 timeouts）。
+
+步骤里的 "page" 字段指定在哪个页面上执行（默认主页面 page）；expect_popup 步骤执行其中的
+子步骤并把弹出的新页面记为 "alias"，之后的步骤可以用这个名字。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .km_flow import _timeout, _timeouts
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Locator, Page
+
+# 步骤文件里 re.compile 的 flags（字母）。
+_REGEX_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL}
+
+# page.keyboard / page.mouse 上允许的方法。编译器（tools/compile_recording.py）也从这里导入。
+DEVICE_METHODS = {
+    "keyboard": {"press", "type", "insert_text", "down", "up"},
+    "mouse": {"click", "dblclick", "move", "down", "up", "wheel"},
+}
+
+# 定位方法白名单，避免步骤文件调用任意方法。编译器也从这里导入。
+LOCATOR_METHODS = {
+    "locator",
+    "get_by_role",
+    "get_by_text",
+    "get_by_label",
+    "get_by_placeholder",
+    "get_by_test_id",
+    "get_by_title",
+    "get_by_alt_text",
+    "filter",
+    "nth",
+    "first",
+    "last",
+    "frame_locator",
+    "content_frame",
+}
+
+
+def load_steps(path: str | os.PathLike[str]) -> list[dict[str, Any]]:
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except FileNotFoundError as exc:
+        raise RuntimeError(f"找不到步骤文件：{path}") from exc
+
+    steps = data.get("steps") if isinstance(data, dict) else data
+    if not isinstance(steps, list):
+        raise RuntimeError(f"步骤文件格式错误：{path}")
+    return steps
+
+
+def _value(raw: Any) -> Any:
+    if isinstance(raw, dict) and "regex" in raw and set(raw) <= {"regex", "flags"}:
+        flags = 0
+        for letter in raw.get("flags", ""):
+            flags |= _REGEX_FLAGS[letter]
+        return re.compile(raw["regex"], flags)
+    if isinstance(raw, dict):
+        return {k: _value(v) for k, v in raw.items()}
+    return raw
+
+
+def resolve_target(page: "Page", chain: list[list[Any]]) -> "Locator":
+    """按 [[方法, 参数, 关键字参数], ...] 从 page 开始构造定位器。"""
+
+    current: Any = page
+    for name, args, kwargs in chain:
+        if name not in LOCATOR_METHODS:
+            raise RuntimeError(f"步骤中包含不支持的定位方法：{name}")
+        attr = getattr(current, name)
+        if name in ("first", "last") and not args and not kwargs:
+            current = attr
+            continue
+        current = attr(*[_value(a) for a in args], **{k: _value(v) for k, v in kwargs.items()})
+    return current
+
+
+def run_steps(page: "Page", steps: list[dict[str, Any]], *, pages: "dict[str, Page] | None" = None) -> None:
+    if pages is None:
+        pages = {"page": page}
+    for index, step in enumerate(steps, start=1):
+        action = step.get("action")
+        try:
+            _run_step(pages, step)
+        except Exception as exc:
+            raise RuntimeError(f"第 {index} 步（{action}）执行失败：{exc}") from exc
+
+
+def _page_of(pages: "dict[str, Page]", step: dict[str, Any]) -> "Page":
+    name = step.get("page", "page")
+    if name not in pages:
+        raise RuntimeError(f"步骤使用了未打开的页面：{name}")
+    return pages[name]
+
+
+def _run_step(pages: "dict[str, Page]", step: dict[str, Any]) -> None:
+    action = step["action"]
+    page = _page_of(pages, step)
+
+    if action == "expect_popup":
+        with _timeouts().measure("step_popup"):
+            with page.expect_popup(timeout=_timeout("step_popup")) as info:
+                run_steps(page, step["steps"], pages=pages)
+            popup = info.value
+        if step.get("alias"):
+            pages[step["alias"]] = popup
+        return
+
+    if action in DEVICE_METHODS:
+        method = step["method"]
+        if method not in DEVICE_METHODS[action]:
+            raise RuntimeError(f"步骤中包含不支持的 {action} 方法：{method}")
+        with _timeouts().measure(f"step_{action}"):
+            getattr(getattr(page, action), method)(*step.get("args", []), **step.get("kwargs", {}))
+        return
+
+    if action == "goto":
+        with _timeouts().measure("step_goto"):
+            page.goto(step["url"], wait_until="domcontentloaded", timeout=_timeout("step_goto"))
+        return
+
+    if action == "fill_many":
+        # 连续填写，中间不插入任何等待。每次填写与单独的 fill 步骤共用 step_fill 的统计和超时。
+        for item in step["fills"]:
+            target = resolve_target(page, item["target"])
+            with _timeouts().measure("step_fill"):
+                target.fill(item["value"], timeout=_timeout("step_fill"))
+        return
+
+    target = resolve_target(page, step["target"])
+    timeout = _timeout(f"step_{action}")
+    with _timeouts().measure(f"step_{action}"):
+        if action == "click":
+            target.click(timeout=timeout)
+        elif action == "dblclick":
+            target.dblclick(timeout=timeout)
+        elif action == "fill":
+            target.fill(step["value"], timeout=timeout)
+        elif action == "press":
+            target.press(step["key"], timeout=timeout)
+        elif action == "check":
+            target.check(timeout=timeout)
+        elif action == "uncheck":
+            target.uncheck(timeout=timeout)
+        elif action == "select":
+            target.select_option(step["value"], timeout=timeout)
+        elif action == "hover":
+            target.hover(timeout=timeout)
+        else:
+            raise RuntimeError(f"未知的步骤类型：{action}")
+
+
+def run_flow_file(page: "Page", path: str | os.PathLike[str]) -> None:
+    run_steps(page, load_steps(path))
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""保存后的批量核对。
+
+“保存后弹窗关闭”不等于服务器真的保存了全部字段。这里在一批表处理完后，
+一次性拉取应用的表/字段列表，与本次提交的内容逐项核对，可选自动补齐。
+
+只有接口响应解析出的快照才可信；读取页面表格得到的快照可能缺字段（列被截断、
+只显示部分字段），此时不核对也不补齐，报告为“无法核对”。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from ..snapshot import SnapshotDiff, diff_tables
+from .export_flow import fetch_app_tables
+from .km_flow import FieldSession, TableResult, TableSpec
+
+
+@dataclass
+class VerifyReport:
+    """核对结果。"""
+
+    checked: int
+    diff: SnapshotDiff
+    repaired: list[TableResult] = field(default_factory=list)
+    # 快照不是来自接口（DOM 兜底）时为 True：diff 为空，结果不能当作核对通过。
+    unverifiable: bool = False
+
+    @property
+    def unresolved(self) -> list[str]:
+        """核对不一致且没有修复成功的表名。
+
+        补齐时返回 duplicate 说明整次保存被“字段名不能重复”拒绝，缺少的字段仍然缺少，不算修复。
+        """
+
+        fixed = {r.table_name for r in self.repaired if r.ok}
+        names = [t.table_name for t in self.diff.missing_tables]
+        names += [t.table_name for t, _ in self.diff.missing_fields]
+        return [n for n in names if n not in fixed]
+
+    @property
+    def ok(self) -> bool:
+        return not self.unverifiable and not self.unresolved
+
+    def print_summary(self) -> None:
+        if self.unverifiable:
+            print(f"无法核对：未能从接口响应中读取字段列表（共 {self.checked} 张表），只按保存结果判断。")
+            return
+        if self.diff.ok:
+            print(f"核对通过：{self.checked} 张表的字段都已保存。")
+            return
+
+        print(f"核对发现不一致（共核对 {self.checked} 张表）：")
+        for line in self.diff.lines():
+            if not line.startswith("服务器多出的表"):
+                print(f"  {line}")
+        for result in self.repaired:
+            print(f"  已补齐：{result.table_name}（{result.status}）")
+        if self.unresolved:
+            print(f"  仍未解决：{'、'.join(self.unresolved)}")
+
+
+def verify_submitted(session: FieldSession, submitted: list[TableSpec], *, repair: bool = False) -> VerifyReport:
+    """拉取一次服务器列表，核对 submitted 中的表和字段是否都已存在。
+
+    repair=True 时：缺少的表重新新建，缺少的字段追加到已有表上。
+    快照只能从页面表格读取时不核对、不补齐，返回 unverifiable=True 的报告。
+    """
+
+    snapshot = fetch_app_tables(session.page, app_name=session.app_name)
+    if snapshot.source != "api":
+        report = VerifyReport(checked=len(submitted), diff=SnapshotDiff(), unverifiable=True)
+        report.print_summary()
+        return report
+
+    diff = diff_tables(submitted, snapshot.tables)
+    diff.extra_tables = []
+    report = VerifyReport(checked=len(submitted), diff=diff)
+
+    if repair and not diff.ok:
+        for table in diff.missing_tables:
+            report.repaired.append(session.create(table.table_name, table.fields))
+        for table, missing in diff.missing_fields:
+            report.repaired.append(session.append(table.table_name, missing))
+
+    report.print_summary()
+    return report
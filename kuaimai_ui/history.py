@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+
+"""运行历史（SQLite）与跨运行的回归报告。
+
+每次 run() 结束后写入一条运行记录：应用、数据文件哈希、代码版本、运行参数、worker 数、
+每张表的结果与耗时、每个步骤（登录、保存……）的耗时分布。`python -m kuaimai_ui report`
+读取历史，输出趋势、最慢的表，以及与前几次运行相比变慢的表/步骤，并提示变慢更可能来自
+代码改动、数据文件改动还是远程后台。
+
+数据库位于缓存目录（.km_cache/history.sqlite3），只用标准库 sqlite3。
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import statistics
+import time
+from collections.abc import Iterable, Sequence
+from contextlib import closing
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .config import setting_flag
+from .paths import PROJECT_ROOT, cache_dir
+
+if TYPE_CHECKING:
+    from .flows.km_flow import TableResult
+
+_DB_FILE = "history.sqlite3"
+
+# 比前几次运行的中位数慢该倍数以上，记为回归。
+REGRESSION_RATIO = 1.5
+
+# 主要耗时在远程后台的步骤（等待接口返回）；其余为本地页面操作。
+SERVER_STEPS = frozenset({"login", "save", "menu", "modal_close", "list"})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    duration_s REAL NOT NULL,
+    ok INTEGER NOT NULL,
+    app TEXT NOT NULL,
+    catalog_hash TEXT NOT NULL,
+    code_version TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    workers INTEGER NOT NULL,
+    tables_done INTEGER NOT NULL,
+    tables_failed INTEGER NOT NULL,
+    fields_done INTEGER NOT NULL,
+    error TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS run_tables (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    table_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    field_count INTEGER NOT NULL,
+    duration_s REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS run_steps (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    step TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    p50_ms REAL NOT NULL,
+    p95_ms REAL NOT NULL,
+    total_ms REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_app ON runs(app, started_at);
+CREATE INDEX IF NOT EXISTS idx_run_tables_run ON run_tables(run_id);
+CREATE INDEX IF NOT EXISTS idx_run_steps_run ON run_steps(run_id);
+"""
+
+
+def history_enabled() -> bool:
+    return setting_flag("KM_HISTORY", "RECORD_HISTORY", True)
+
+
+def history_path() -> Path:
+    return cache_dir() / _DB_FILE
+
+
+def connect(path: Path | None = None) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path or history_path()))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def code_version() -> str:
+    """当前代码的 git 提交（读 .git 目录，不调用 git）；不是 git 仓库时返回空字符串。"""
+
+    git = PROJECT_ROOT / ".git"
+    try:
+        head = (git / "HEAD").read_text(encoding="utf-8").strip()
+        if not head.startswith("ref: "):
+            return head[:12]
+        ref = head[5:]
+        ref_file = git / ref
+        if ref_file.exists():
+            return ref_file.read_text(encoding="utf-8").strip()[:12]
+        for line in (git / "packed-refs").read_text(encoding="utf-8").splitlines():
+            if line.endswith(" " + ref):
+                return line.split()[0][:12]
+    except OSError:
+        pass
+    return ""
+
+
+def _percentile(values: Sequence[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+
+def record_run(
+    *,
+    app: str,
+    catalog_hash: str,
+    profile: str,
+    workers: int,
+    ok: bool,
+    started_at: float,
+    duration_s: float,
+    results: "Iterable[TableResult]" = (),
+    step_samples: dict[str, list[float]] | None = None,
+    error: str = "",
+    path: Path | None = None,
+) -> int:
+    """写入一次运行，返回运行编号。step_samples 为 {步骤: [秒, ...]}。"""
+
+    results = list(results)
+    processed = [r for r in results if r.status != "unchanged"]
+    with closing(connect(path)) as conn, conn:
+        cur = conn.execute(
+            "INSERT INTO runs (started_at, duration_s, ok, app, catalog_hash, code_version, profile, workers,"
+            " tables_done, tables_failed, fields_done, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                started_at,
+                duration_s,
+                int(ok),
+                app,
+                catalog_hash,
+                code_version(),
+                profile,
+                workers,
+                sum(1 for r in processed if r.ok),
+                sum(1 for r in processed if r.status == "failed"),
+                sum(r.field_count for r in processed if r.ok),
+                error,
+            ),
+        )
+        run_id = int(cur.lastrowid or 0)
+        conn.executemany(
+            "INSERT INTO run_tables (run_id, table_name, status, field_count, duration_s) VALUES (?, ?, ?, ?, ?)",
+            [(run_id, r.table_name, r.status, r.field_count, r.duration_s) for r in processed],
+        )
+        conn.executemany(
+            "INSERT INTO run_steps (run_id, step, count, p50_ms, p95_ms, total_ms) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    run_id,
+                    step,
+                    len(values),
+                    _percentile(values, 0.5) * 1000,
+                    _percentile(values, 0.95) * 1000,
+                    sum(values) * 1000,
+                )
+                for step, values in sorted((step_samples or {}).items())
+                if values
+            ],
+        )
+    return run_id
+
+
+# ---- 报告 ----
+
+
+def _fmt_time(ts: float) -> str:
+    return time.strftime("%m-%d %H:%M", time.localtime(ts))
+
+
+def _per_field(duration_s: float, fields: int) -> float | None:
+    return duration_s / fields if fields > 0 else None
+
+
+def build_report(
+    *,
+    app: str | None = None,
+    last: int = 10,
+    top: int = 10,
+    path: Path | None = None,
+) -> list[str]:
+    """生成报告文本（逐行）。app 为空时取最近一次运行的应用。"""
+
+    with closing(connect(path)) as conn:
+        if app is None:
+            row = conn.execute("SELECT app FROM runs ORDER BY started_at DESC LIMIT 1").fetchone()
+            if row is None:
+                return ["还没有运行记录（每次 python -m kuaimai_ui run 结束后自动记录）。"]
+            app = str(row["app"])
+
+        runs = conn.execute(
+            "SELECT * FROM runs WHERE app = ? ORDER BY started_at DESC LIMIT ?", (app, max(1, last) + 1)
+        ).fetchall()
+        if not runs:
+            return [f"应用 {app} 还没有运行记录。"]
+
+        latest, previous = runs[0], [r for r in runs[1:] if r["ok"]][:last]
+        lines = [f"应用：{app}，最近 {min(len(runs), last)} 次运行："]
+        lines.append("  时间         耗时(秒)  结果  表(成功/失败)  字段  秒/字段  worker  数据文件  代码      参数")
+        for run in runs[:last]:
+            per_field = _per_field(run["duration_s"], run["fields_done"])
+            lines.append(
+                f"  {_fmt_time(run['started_at'])}  {run['duration_s']:>8.1f}  {'成功' if run['ok'] else '失败'}  "
+                f"{run['tables_done']:>5}/{run['tables_failed']:<6}  {run['fields_done']:>4}  "
+                f"{(f'{per_field:.2f}' if per_field is not None else '-'):>7}  {run['workers']:>6}  "
+                f"{run['catalog_hash'][:8]:<8}  {run['code_version'][:8] or '-':<8}  {run['profile']}"
+            )
+
+        tables = conn.execute(
+            "SELECT * FROM run_tables WHERE run_id = ? AND field_count > 0 ORDER BY duration_s DESC", (latest["id"],)
+        ).fetchall()
+        if tables:
+            lines.append(f"最近一次运行最慢的 {min(top, len(tables))} 张表：")
+            for t in tables[:top]:
+                lines.append(
+                    f"  {t['table_name']}：{t['duration_s']:.1f} 秒，{t['field_count']} 个字段"
+                    f"（{t['duration_s'] / t['field_count']:.2f} 秒/字段，{t['status']}）"
+                )
+
+        if not previous:
+            lines.append("没有可对比的历史运行。")
+            return lines
+
+        prev_ids = [r["id"] for r in previous]
+        marks = ",".join("?" * len(prev_ids))
+        lines.extend(_table_regressions(conn, latest["id"], prev_ids, marks, top))
+        step_lines, server_slow, client_slow = _step_regressions(conn, latest["id"], prev_ids, marks)
+        lines.extend(step_lines)
+        lines.extend(_attribution(latest, previous, server_slow, client_slow))
+        return lines
+
+
+def _table_regressions(conn: sqlite3.Connection, run_id: int, prev_ids: list[int], marks: str, top: int) -> list[str]:
+    history: dict[str, list[float]] = {}
+    for row in conn.execute(
+        f"SELECT table_name, duration_s, field_count FROM run_tables WHERE run_id IN ({marks})"
+        " AND status IN ('created', 'appended') AND field_count > 0",
+        prev_ids,
+    ):
+        history.setdefault(row["table_name"], []).append(row["duration_s"] / row["field_count"])
+
+    slower: list[tuple[float, str, float, float]] = []
+    for row in conn.execute(
+        "SELECT table_name, duration_s, field_count FROM run_tables WHERE run_id = ?"
+        " AND status IN ('created', 'appended') AND field_count > 0",
+        (run_id,),
+    ):
+        past = history.get(row["table_name"])
+        if not past:
+            continue
+        base = statistics.median(past)
+        now = row["duration_s"] / row["field_count"]
+        if base > 0 and now >= base * REGRESSION_RATIO:
+            slower.append((now / base, row["table_name"], base, now))
+
+    if not slower:
+        return ["与前几次运行相比，没有明显变慢的表。"]
+    slower.sort(reverse=True)
+    lines = [f"变慢的表（每字段耗时，与前 {len(prev_ids)} 次运行的中位数相比）："]
+    for ratio, name, base, now in slower[:top]:
+        lines.append(f"  {name}：{base:.2f} -> {now:.2f} 秒/字段（{ratio:.1f} 倍）")
+    return lines
+
+
+def _step_regressions(
+    conn: sqlite3.Connection, run_id: int, prev_ids: list[int], marks: str
+) -> tuple[list[str], list[str], list[str]]:
+    history: dict[str, list[float]] = {}
+    for row in conn.execute(f"SELECT step, p50_ms FROM run_steps WHERE run_id IN ({marks})", prev_ids):
+        history.setdefault(row["step"], []).append(row["p50_ms"])
+
+    lines: list[str] = []
+    server_slow: list[str] = []
+    client_slow: list[str] = []
+    for row in conn.execute("SELECT step, p50_ms FROM run_steps WHERE run_id = ? ORDER BY step", (run_id,)):
+        past = history.get(row["step"])
+        if not past:
+            continue
+        base = statistics.median(past)
+        if base > 0 and row["p50_ms"] >= base * REGRESSION_RATIO:
+            lines.append(f"  {row['step']}：{base:.0f} -> {row['p50_ms']:.0f} 毫秒（中位数）")
+            (server_slow if row["step"] in SERVER_STEPS else client_slow).append(row["step"])
+
+    if lines:
+        lines.insert(0, "变慢的步骤：")
+    return lines, server_slow, client_slow
+
+
+def _attribution(
+    latest: sqlite3.Row, previous: list[sqlite3.Row], server_slow: list[str], client_slow: list[str]
+) -> list[str]:
+    base = [r["duration_s"] / r["fields_done"] for r in previous if r["fields_done"]]
+    now = _per_field(latest["duration_s"], latest["fields_done"])
+    overall_slow = bool(base) and now is not None and now >= statistics.median(base) * REGRESSION_RATIO
+    if not overall_slow and not server_slow and not client_slow:
+        return ["整体耗时与前几次运行相当。"]
+
+    hints: list[str] = []
+    last_ok = previous[0]
+    if latest["catalog_hash"] != last_ok["catalog_hash"]:
+        hints.append("数据文件与上次成功运行不同（表/字段有增减），耗时变化可能来自数据本身")
+    if latest["code_version"] and latest["code_version"] != last_ok["code_version"]:
+        hints.append(f"代码版本有变化（{last_ok['code_version'][:8] or '-'} -> {latest['code_version'][:8]}）")
+    if latest["profile"] != last_ok["profile"] or latest["workers"] != last_ok["workers"]:
+        hints.append("运行参数或 worker 数与上次不同")
+    if server_slow:
+        hints.append(f"等待后台的步骤变慢（{'、'.join(server_slow)}），远程后台可能变慢或在限流")
+    if client_slow:
+        hints.append(f"本地页面操作变慢（{'、'.join(client_slow)}），可能是代码改动或本机/浏览器的问题")
+    if not hints:
+        hints.append("数据文件、代码与参数都未变化，也没有单个步骤明显变慢；可用 doctor --perf 检查本机与网络")
+    return ["可能的原因：", *(f"  - {h}" for h in hints)]
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""同步清单：记录每个应用上次成功同步时每张表的内容哈希。
+
+下次运行只处理新增的表和有变化的表，日常增量运行的耗时与改动量成正比，
+而不是与数据文件大小成正比。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .flows.km_flow import TableSpec
+from .paths import cache_dir
+
+_MANIFEST_FILE = "manifest.json"
+
+
+def table_hash(table: TableSpec) -> str:
+    """表名 + 有序字段列表的哈希（YAML 节点名不参与）。"""
+
+    payload = json.dumps([table.table_name, list(table.fields)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def catalog_hash(tables: list[TableSpec]) -> str:
+    """整个数据文件内容的哈希（按顺序）。"""
+
+    digest = hashlib.sha256()
+    for table in tables:
+        digest.update(table_hash(table).encode("ascii"))
+    return digest.hexdigest()
+
+
+@dataclass
+class SyncPlan:
+    """一次增量同步要做的事。"""
+
+    new: list[TableSpec] = field(default_factory=list)
+    # (表定义, 需要追加的字段)
+    changed: list[tuple[TableSpec, list[str]]] = field(default_factory=list)
+    unchanged: list[TableSpec] = field(default_factory=list)
+    # 只删除/调整了字段顺序，服务器上无需操作，直接更新清单即可。
+    relabel: list[TableSpec] = field(default_factory=list)
+    empty: list[TableSpec] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"新增 {len(self.new)} 张，变更 {len(self.changed)} 张，"
+            f"未变化 {len(self.unchanged) + len(self.relabel)} 张，空表 {len(self.empty)} 张"
+        )
+
+
+class Manifest:
+    """按应用保存 {表名: {hash, fields}}。"""
+
+    def __init__(self, path: Path, data: dict[str, dict[str, dict[str, object]]] | None = None) -> None:
+        self.path = path
+        self.data: dict[str, dict[str, dict[str, object]]] = data or {}
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> "Manifest":
+        if path is None:
+            path = cache_dir() / _MANIFEST_FILE
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            raw = {}
+        return cls(path, raw if isinstance(raw, dict) else {})
+
+    def plan(self, app_name: str, tables: list[TableSpec]) -> SyncPlan:
+        synced = self.data.get(app_name, {})
+        result = SyncPlan()
+
+        for table in tables:
+            if not table.fields:
+                result.empty.append(table)
+                continue
+
+            entry = synced.get(table.table_name)
+            if entry is None:
+                result.new.append(table)
+                continue
+
+            if entry.get("hash") == table_hash(table):
+                result.unchanged.append(table)
+                continue
+
+            old_fields = set(entry.get("fields") or [])
+            added = [f for f in table.fields if f not in old_fields]
+            if added:
+                result.changed.append((table, added))
+            else:
+                result.relabel.append(table)
+
+        return result
+
+    def mark_synced(self, app_name: str, table: TableSpec) -> None:
+        self.data.setdefault(app_name, {})[table.table_name] = {
+            "hash": table_hash(table),
+            "fields": list(table.fields),
+        }
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
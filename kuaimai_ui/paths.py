@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+"""项目内常用路径。"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from .config import setting_value
+
+# kuaimai_ui/paths.py -> 项目根目录
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def cache_dir() -> Path:
+    """本地缓存目录（统计数据、清单等），不存在时自动创建。
+
+    优先级：环境变量 KM_CACHE_DIR > settings.CACHE_DIR；相对路径按项目根目录解析。
+    """
+
+    raw = setting_value("KM_CACHE_DIR", "CACHE_DIR", ".km_cache")
+    path = Path(raw)
+    if not path.is_absolute():
+        path = PROJECT_ROOT / path
+    path.mkdir(parents=True, exist_ok=True)
+    return path
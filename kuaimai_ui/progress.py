@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+"""字段级进度汇报。
+
+- 终端：TTY 下显示单行进度条，非 TTY（CI 日志）下每张表输出一行
+- 机器可读：可选写入 JSON Lines 事件流（每个字段一条）
+- 速度按最近一段时间窗口的移动平均计算（字段/秒），据此估算剩余时间
+- 多个 worker 可共用同一个实例（线程安全），进度自动汇总
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO
+
+from .config import setting_value
+
+# 计算速度的移动窗口（秒）。
+WINDOW_SECONDS = float(os.getenv("KM_PROGRESS_WINDOW_S", "60"))
+
+# 最近速度低于整体平均速度的该比例时，判定为“变慢”。
+SLOWDOWN_RATIO = float(os.getenv("KM_PROGRESS_SLOWDOWN_RATIO", "0.5"))
+
+_BAR_WIDTH = 24
+
+
+@dataclass(frozen=True)
+class ProgressSnapshot:
+    """某一时刻的汇总进度。"""
+
+    done_fields: int
+    total_fields: int
+    done_tables: int
+    total_tables: int
+    elapsed_s: float
+    rate: float | None
+    eta_s: float | None
+
+
+def _format_eta(seconds: float | None) -> str:
+    if seconds is None:
+        return "--:--"
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def _default_jsonl_path() -> Path | None:
+    raw = setting_value("KM_PROGRESS_JSONL", "PROGRESS_JSONL_PATH", "")
+    return Path(raw) if raw else None
+
+
+class ProgressReporter:
+    """按字段粒度汇报进度，并估算剩余时间。"""
+
+    def __init__(
+        self,
+        *,
+        total_tables: int = 0,
+        total_fields: int = 0,
+        jsonl_path: str | os.PathLike[str] | None = None,
+        stream: IO[str] | None = None,
+        window_s: float = WINDOW_SECONDS,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._stream = stream if stream is not None else sys.stdout
+        self._tty = bool(getattr(self._stream, "isatty", lambda: False)())
+        self._window_s = max(1.0, float(window_s))
+
+        self.total_tables = int(total_tables)
+        self.total_fields = int(total_fields)
+        self.done_tables = 0
+        self.done_fields = 0
+        self.worker_fields: dict[str, int] = {}
+        self._planned_tables = 0
+
+        self._start = time.monotonic()
+        self._samples: deque[tuple[float, int]] = deque([(self._start, 0)])
+        self._last_slowdown = 0.0
+        self._bar_shown = False
+
+        path = Path(jsonl_path) if jsonl_path is not None else _default_jsonl_path()
+        self._jsonl: IO[str] | None = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._jsonl = path.open("a", encoding="utf-8")
+
+        self._emit("run_start")
+
+    # ---- 对外接口 ----
+
+    def add_work(self, *, tables: int, fields: int) -> None:
+        """追加总工作量（多应用/多 worker 共用一个实例时使用）。"""
+
+        with self._lock:
+            self.total_tables += int(tables)
+            self.total_fields += int(fields)
+
+    def plan(self, *, tables: int, fields: int) -> None:
+        """预先登记工作量；之后每张表开始前用 take_planned() 领取，不再重复计入总量。"""
+
+        self.add_work(tables=tables, fields=fields)
+        with self._lock:
+            self._planned_tables += int(tables)
+
+    def take_planned(self) -> bool:
+        """领取一张预先登记过的表；没有可领取的返回 False（调用方需 add_work）。"""
+
+        with self._lock:
+            if self._planned_tables <= 0:
+                return False
+            self._planned_tables -= 1
+            return True
+
+    def start_table(self, table_name: str, field_count: int, *, worker: str = "main") -> None:
+        with self._lock:
+            self._log(f"正在处理：{table_name}，字段数 {field_count}")
+            self._emit("table_start", table=table_name, worker=worker, table_fields=field_count)
+
+    def field_done(self, table_name: str, *, worker: str = "main", count: int = 1) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self.done_fields += count
+            self.worker_fields[worker] = self.worker_fields.get(worker, 0) + count
+            self._samples.append((now, self.done_fields))
+            while len(self._samples) > 2 and now - self._samples[1][0] >= self._window_s:
+                self._samples.popleft()
+
+            self._emit("field", table=table_name, worker=worker)
+            self._check_slowdown(now)
+            self._draw_bar()
+
+    def table_done(self, table_name: str, *, ok: bool, worker: str = "main", skipped_fields: int = 0) -> None:
+        """一张表结束。skipped_fields 为未计入进度的字段数（例如中途失败）。"""
+
+        with self._lock:
+            self.done_tables += 1
+            if skipped_fields:
+                # 未完成的字段不再等待，从总量里扣除，避免 ETA 偏大。
+                self.total_fields = max(self.done_fields, self.total_fields - skipped_fields)
+            self._emit("table_done", table=table_name, worker=worker, ok=ok)
+            self._draw_bar()
+
+    def snapshot(self) -> ProgressSnapshot:
+        with self._lock:
+            return self._snapshot(time.monotonic())
+
+    def close(self) -> None:
+        with self._lock:
+            self._emit("run_done", workers=dict(self.worker_fields))
+            if self._bar_shown:
+                self._stream.write("\n")
+                self._stream.flush()
+                self._bar_shown = False
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+
+    def __enter__(self) -> "ProgressReporter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    # ---- 内部实现（调用方需持有锁） ----
+
+    def _rate(self, now: float) -> float | None:
+        t0, n0 = self._samples[0]
+        span = now - t0
+        if span <= 0 or self.done_fields <= n0:
+            return None
+        return (self.done_fields - n0) / span
+
+    def _snapshot(self, now: float) -> ProgressSnapshot:
+        rate = self._rate(now)
+        remaining = max(0, self.total_fields - self.done_fields)
+        eta = remaining / rate if rate else None
+        return ProgressSnapshot(
+            done_fields=self.done_fields,
+            total_fields=self.total_fields,
+            done_tables=self.done_tables,
+            total_tables=self.total_tables,
+            elapsed_s=now - self._start,
+            rate=rate,
+            eta_s=eta,
+        )
+
+    def _check_slowdown(self, now: float) -> None:
+        elapsed = now - self._start
+        if elapsed < 2 * self._window_s or now - self._last_slowdown < self._window_s:
+            return
+
+        recent = self._rate(now)
+        overall = self.done_fields / elapsed if elapsed > 0 else None
+        if recent is None or not overall:
+            return
+
+        if recent < overall * SLOWDOWN_RATIO:
+            self._last_slowdown = now
+            self._log(f"警告：处理速度下降，最近 {recent:.2f} 字段/秒，整体平均 {overall:.2f} 字段/秒")
+            self._emit("slowdown", recent_rate=round(recent, 4), overall_rate=round(overall, 4))
+
+    def _emit(self, event: str, **extra: object) -> None:
+        if self._jsonl is None:
+            return
+        snap = self._snapshot(time.monotonic())
+        record: dict[str, object] = {"ts": round(time.time(), 3), "event": event}
+        record.update({k: round(v, 3) if isinstance(v, float) else v for k, v in asdict(snap).items()})
+        record.update(extra)
+        self._jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._jsonl.flush()
+
+    def _log(self, message: str) -> None:
+        if self._bar_shown:
+            self._stream.write("\r\x1b[K")
+            self._bar_shown = False
+        self._stream.write(message + "\n")
+        self._stream.flush()
+        self._draw_bar()
+
+    def _draw_bar(self) -> None:
+        if not self._tty or self.total_fields <= 0:
+            return
+
+        snap = self._snapshot(time.monotonic())
+        ratio = min(1.0, snap.done_fields / snap.total_fields)
+        filled = int(round(ratio * _BAR_WIDTH))
+        rate_text = "--" if snap.rate is None else f"{snap.rate:.2f}"
+        line = (
+            f"[{'#' * filled}{'-' * (_BAR_WIDTH - filled)}] {ratio * 100:5.1f}%"
+            f"  字段 {snap.done_fields}/{snap.total_fields}"
+            f"  表 {snap.done_tables}/{snap.total_tables}"
+            f"  {rate_text} 字段/秒  剩余 {_format_eta(snap.eta_s)}"
+        )
+        self._stream.write("\r\x1b[K" + line)
+        self._stream.flush()
+        self._bar_shown = True
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+"""长时间运行的页面健康度：JS 堆内存与每张表耗时趋势。
+
+同一个页面反复打开/关闭弹窗后，SPA 的内存会上涨，后面的表越来越慢。
+PageHealth 在每张表之后记录耗时，并定期通过 CDP 读取 JS 堆大小；
+超过阈值时由 FieldSession 在两张表之间回收页面（或上下文）并恢复到字段管理页。
+"""
+
+from __future__ import annotations
+
+import statistics
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from .config import setting_value
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
+
+# 最近 N 张表作为当前水平；之前的表（至少 N 张）作为基线。
+TREND_WINDOW = 5
+
+
+def recycle_mode() -> str:
+    """page / context / off。"""
+
+    mode = setting_value("KM_RECYCLE_MODE", "RECYCLE_MODE", "page").strip().lower()
+    return mode if mode in ("page", "context") else "off"
+
+
+def _fit_line(samples: list[tuple[int, float]]) -> "Callable[[int], float]":
+    """最小二乘拟合 耗时 = 固定开销 + 每字段耗时 × 字段数。
+
+    字段数都相同（无法区分两部分）或拟合结果不合理时，退回为基线耗时的中位数，
+    这时对更小的表只会高估预测值，不会误判为变慢。
+    """
+
+    median = statistics.median(d for _, d in samples)
+    counts = [n for n, _ in samples]
+    mean_n = statistics.fmean(counts)
+    var_n = sum((n - mean_n) ** 2 for n in counts)
+    if var_n == 0:
+        return lambda n: median
+
+    mean_d = statistics.fmean(d for _, d in samples)
+    slope = sum((n - mean_n) * (d - mean_d) for n, d in samples) / var_n
+    intercept = mean_d - slope * mean_n
+    if slope < 0 or intercept < 0:
+        return lambda n: median
+    return lambda n: intercept + slope * n
+
+
+class PageHealth:
+    """跟踪一个页面的内存与耗时，判断是否需要回收。"""
+
+    def __init__(self, page: "Page") -> None:
+        self.heap_limit_mb = setting_value("KM_RECYCLE_HEAP_MB", "RECYCLE_HEAP_MB", 400.0)
+        self.slowdown_ratio = setting_value("KM_RECYCLE_SLOWDOWN", "RECYCLE_SLOWDOWN_RATIO", 1.5)
+        self.every_n_tables = setting_value("KM_RECYCLE_EVERY", "RECYCLE_EVERY_N_TABLES", 0)
+        self.check_every = max(1, setting_value("KM_RECYCLE_CHECK_EVERY", "RECYCLE_CHECK_EVERY", 5))
+        self.reset(page)
+
+    def reset(self, page: "Page") -> None:
+        self.page = page
+        self.tables = 0
+        # (字段数, 耗时秒)
+        self.samples: list[tuple[int, float]] = []
+        self._cdp: Any = None
+        self._cdp_failed = False
+
+    def heap_mb(self) -> float | None:
+        """当前 JS 堆使用量（MB）；非 Chromium 或 CDP 不可用时返回 None。"""
+
+        if self._cdp_failed:
+            return None
+        try:
+            if self._cdp is None:
+                self._cdp = self.page.context.new_cdp_session(self.page)
+                self._cdp.send("Performance.enable")
+            metrics = self._cdp.send("Performance.getMetrics")["metrics"]
+        except Exception:
+            self._cdp_failed = True
+            return None
+
+        for item in metrics:
+            if item.get("name") == "JSHeapUsedSize":
+                return float(item["value"]) / 1024 / 1024
+        return None
+
+    def record_table(self, duration_s: float, field_count: int) -> None:
+        self.tables += 1
+        if field_count > 0:
+            self.samples.append((field_count, duration_s))
+
+    def slowdown(self) -> float | None:
+        """最近几张表的实际耗时 / 按基线预测的耗时（中位数）；样本不足时返回 None。
+
+        每张表的耗时 ≈ 固定开销（弹窗、保存、限速等待）+ 每字段耗时 × 字段数。
+        表按字段数从大到小处理，直接比较“耗时/字段数”会因为固定开销摊到更少的字段上而
+        越来越大，所以先用基线表拟合这条直线，再按各表的字段数预测耗时进行比较。
+        """
+
+        if len(self.samples) < 2 * TREND_WINDOW:
+            return None
+        baseline = self.samples[:-TREND_WINDOW]
+        recent = self.samples[-TREND_WINDOW:]
+        predict = _fit_line(baseline)
+        ratios = [d / predict(n) for n, d in recent if predict(n) > 0]
+        return statistics.median(ratios) if ratios else None
+
+    def should_recycle(self) -> str | None:
+        """需要回收时返回原因，否则返回 None。"""
+
+        if self.every_n_tables and self.tables >= self.every_n_tables:
+            return f"已连续处理 {self.tables} 张表"
+
+        if self.tables % self.check_every != 0:
+            return None
+
+        ratio = self.slowdown()
+        if ratio is not None and ratio > self.slowdown_ratio:
+            return f"最近几张表的耗时是同样字段数下预期的 {ratio:.1f} 倍"
+
+        heap = self.heap_mb()
+        if heap is not None and heap > self.heap_limit_mb:
+            return f"JS 堆内存 {heap:.0f} MB 超过 {self.heap_limit_mb:.0f} MB"
+
+        return None
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+"""完整运行：启动浏览器 → 登录 → 根据 YAML 新建字段 → 关闭浏览器并输出总耗时。"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from typing import TYPE_CHECKING
+
+from . import settings as km_settings
+from .config import setting_value
+from .credentials import Account, CredentialPool
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
+
+    from .flows.km_flow import TableResult
+
+
+def _worker_opener(
+    pool: CredentialPool, *, headless: bool, slow_mo: int
+) -> "Callable[[int], AbstractContextManager[tuple[Page, Account]]]":
+    """额外 worker 的页面：在 worker 线程内启动自己的浏览器，并从账号池借一个账号。"""
+
+    @contextmanager
+    def open_worker(index: int) -> "Iterator[tuple[Page, Account]]":
+        from playwright.sync_api import sync_playwright
+
+        from .flows.km_flow import leased_account_page
+
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=headless, slow_mo=slow_mo)
+            try:
+                with leased_account_page(browser, pool, prefer=index) as opened:
+                    yield opened
+            finally:
+                browser.close()
+
+    return open_worker
+
+
+def _record_history(
+    *,
+    app_name: str | None,
+    yaml_path: str | os.PathLike[str] | None,
+    profile: str,
+    workers: int,
+    ok: bool,
+    started_at: float,
+    duration_s: float,
+    results: "list[TableResult]",
+    samples_before: dict[str, int],
+    error: str,
+) -> None:
+    """把本次运行写入历史库；任何失败只打印提示，不影响运行结果。"""
+
+    from .history import history_enabled, record_run
+
+    if not history_enabled():
+        return
+
+    from .flows.km_flow import _timeouts, get_app_name, load_table_specs_from_yaml, resolve_data_yaml_path
+    from .manifest import catalog_hash
+
+    try:
+        try:
+            digest = catalog_hash(load_table_specs_from_yaml(resolve_data_yaml_path(yaml_path)))
+        except RuntimeError:
+            digest = ""
+        # 只取本次运行新增的样本（同一进程多次 run() 时不重复计入）。
+        steps = {k: v[samples_before.get(k, 0) :] for k, v in _timeouts().run_samples().items()}
+        record_run(
+            app=get_app_name(app_name),
+            catalog_hash=digest,
+            profile=profile,
+            workers=workers,
+            ok=ok,
+            started_at=started_at,
+            duration_s=duration_s,
+            results=results,
+            step_samples=steps,
+            error=error,
+        )
+    except Exception as exc:
+        print(f"运行历史写入失败：{exc}")
+
+
+def run(
+    *,
+    app_name: str | None = None,
+    yaml_path: str | os.PathLike[str] | None = None,
+    headless: bool = False,
+    slow_mo: int = 300,
+    incremental: bool | None = None,
+    verify: bool | None = None,
+    workers: int | None = None,
+) -> None:
+    from .flows.km_flow import (
+        _format_duration,
+        _resolve_run_flags,
+        _timeouts,
+        create_tables_from_yaml,
+        leased_account_page,
+        print_playwright_setup_help,
+    )
+
+    try:
+        from playwright.sync_api import sync_playwright
+    except ModuleNotFoundError as exc:
+        print_playwright_setup_help(f"缺少 Python 包：{exc}")
+        raise SystemExit(2) from exc
+    except ImportError as exc:
+        print_playwright_setup_help(f"导入 Playwright 失败：{exc}")
+        raise SystemExit(2) from exc
+
+    pool = CredentialPool.load()
+    if workers is None:
+        workers = setting_value("KM_WORKERS", "WORKERS", 1) or 1
+    if workers > pool.capacity:
+        print(f"账号池共 {len(pool.accounts)} 个账号、最多 {pool.capacity} 个并发会话，worker 数调整为 {pool.capacity}")
+        workers = pool.capacity
+
+    start = time.monotonic()
+    started_at = time.time()
+    ok = False
+    auto_duration: float | None = None
+    # 由 create_tables_from_yaml 边处理边追加，失败的运行也能记录已完成的表。
+    results: list[TableResult] = []
+    error = ""
+    samples_before = {k: len(v) for k, v in _timeouts().run_samples().items()}
+    # 记录实际生效的模式（命令行未指定时来自环境变量/settings），与 create_tables_from_yaml 的判断一致。
+    incremental, verify = _resolve_run_flags(incremental, verify)
+    profile = " ".join(
+        [
+            "headless" if headless else "headed",
+            f"slow_mo={slow_mo}",
+            "incremental" if incremental else "full",
+            "verify" if verify else "no-verify",
+        ]
+    )
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=headless, slow_mo=slow_mo)
+
+        try:
+            with leased_account_page(browser, pool) as (page, account):
+                create_tables_from_yaml(
+                    page,
+                    app_name=app_name,
+                    yaml_path=yaml_path,
+                    incremental=incremental,
+                    verify=verify,
+                    account=account,
+                    workers=workers,
+                    open_worker=_worker_opener(pool, headless=headless, slow_mo=slow_mo),
+                    results=results,
+                )
+                auto_duration = time.monotonic() - start
+                ok = True
+
+                # 运行中页面可能被回收（见 FieldSession.recycle），context 模式下还会换到新的上下文，
+                # 取浏览器里最新打开的页面。
+                if page.is_closed():
+                    live = [pg for ctx in browser.contexts for pg in ctx.pages if not pg.is_closed()]
+                    if live:
+                        page = live[-1]
+
+                if not headless and not page.is_closed() and getattr(km_settings, "PAUSE_AFTER_RUN", False):
+                    print("已开启 PAUSE_AFTER_RUN，将暂停页面，手动关闭后再结束。")
+                    page.pause()
+        except Exception as exc:
+            error = (str(exc) or exc.__class__.__name__).splitlines()[0]
+            raise
+        finally:
+            duration = auto_duration if auto_duration is not None else time.monotonic() - start
+            status = "成功" if ok else "失败"
+            print(f"本次运行{status}，总耗时：{_format_duration(duration)}")
+            browser.close()
+            _record_history(
+                app_name=app_name,
+                yaml_path=yaml_path,
+                profile=profile,
+                workers=workers,
+                ok=ok,
+                started_at=started_at,
+                duration_s=duration,
+                results=results,
+                samples_before=samples_before,
+                error=error,
+            )
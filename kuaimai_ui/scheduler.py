@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+"""对后台写操作（保存）的统一调度。
+
+- 多个 worker 并行时，令牌桶限制保存频率（只有一个 worker 时不限速）
+- 每个账号同时打开的会话数有上限（只在本进程内生效，见 session()）
+- 字段多的表优先处理，最后不会剩一张大表拖尾
+- 保存变慢或出错变多时自动降速（乘性减小），恢复后逐步提速（加性增加）
+
+同一进程内的线程共用一个调度器；pytest-xdist 的每个 worker 是独立进程，
+这时按 worker 数平分全局速率。
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from typing import TypeVar
+
+from .config import setting_value
+
+T = TypeVar("T")
+
+# 观察最近多少次保存来判断延迟/错误率。
+_WINDOW = 20
+# 用最早多少次保存的中位数作为“健康”延迟基线。
+_BASELINE_SAMPLES = 5
+# 延迟超过基线该倍数，或错误率超过该比例时降速。
+LATENCY_BACKOFF_RATIO = 2.0
+ERROR_BACKOFF_RATE = 0.2
+# 连续多少次健康的保存后提速一档。
+_RECOVER_AFTER = 10
+
+
+class TokenBucket:
+    """线程安全的令牌桶。rate_per_s <= 0 表示不限速。"""
+
+    def __init__(self, rate_per_s: float, burst: float) -> None:
+        self.rate = float(rate_per_s)
+        self.capacity = max(1.0, float(burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """取一个令牌，必要时等待；返回等待的秒数。"""
+
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                if self.rate <= 0:
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def set_rate(self, rate_per_s: float) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate_per_s)
+
+
+class WriteScheduler:
+    """保存限速、账号会话上限、优先级与自适应降速。
+
+    rate_per_s <= 0 时不限速，也不做自适应降速。
+    """
+
+    def __init__(
+        self,
+        *,
+        rate_per_s: float,
+        burst: float = 2,
+        max_sessions_per_account: int = 2,
+        min_rate_per_s: float | None = None,
+    ) -> None:
+        self.max_rate = max(0.0, float(rate_per_s))
+        self.min_rate = float(min_rate_per_s) if min_rate_per_s is not None else self.max_rate / 8
+        self.bucket = TokenBucket(rate_per_s, burst)
+        self.max_sessions_per_account = max(1, int(max_sessions_per_account))
+
+        self._lock = threading.Lock()
+        self._sessions: dict[str, threading.BoundedSemaphore] = {}
+        self._latencies: deque[float] = deque(maxlen=_WINDOW)
+        self._errors: deque[bool] = deque(maxlen=_WINDOW)
+        self._baseline: float | None = None
+        self._first: list[float] = []
+        self._healthy_streak = 0
+        # 每个线程累计在令牌桶上等待的秒数（见 throttled_s）。
+        self._local = threading.local()
+
+    # ---- 优先级 ----
+
+    @staticmethod
+    def order(items: Iterable[T], *, size: Callable[[T], int]) -> list[T]:
+        """按工作量从大到小排序（稳定排序，工作量相同保持原顺序）。"""
+
+        return sorted(items, key=lambda item: -size(item))
+
+    # ---- 账号会话 ----
+
+    @contextmanager
+    def session(self, account: str, *, limit: int | None = None) -> Iterator[None]:
+        """占用账号的一个会话名额，名额用完时等待其他会话结束。
+
+        limit：该账号自己的会话数上限（账号池里单独配置的），默认 max_sessions_per_account。
+
+        名额只在本进程内计数：pytest-xdist 的每个 worker 各自计数，同一账号在 N 个 worker 中
+        最多可能同时打开 N × limit 个会话。多进程运行时请给每个 worker 分配不同的账号
+        （账号池按 worker 序号错开选择），或相应调低会话数。
+        """
+
+        limit = limit or self.max_sessions_per_account
+        with self._lock:
+            sem = self._sessions.setdefault(account, threading.BoundedSemaphore(limit))
+        if not sem.acquire(blocking=False):
+            print(f"账号 {account} 的会话数已达上限（{limit}），等待空闲名额……")
+            sem.acquire()
+        try:
+            yield
+        finally:
+            sem.release()
+
+    # ---- 保存限速与自适应 ----
+
+    def set_max_rate(self, rate_per_s: float) -> None:
+        """调整速率上限（例如运行中才知道有多个 worker）；<= 0 表示不限速。"""
+
+        with self._lock:
+            self.max_rate = max(0.0, float(rate_per_s))
+            self.min_rate = self.max_rate / 8
+            self._healthy_streak = 0
+            self.bucket.set_rate(self.max_rate)
+
+    @contextmanager
+    def save_slot(self) -> Iterator[None]:
+        """包住一次“保存”：先取令牌，结束后记录延迟与是否出错。"""
+
+        waited = self.bucket.acquire()
+        self._local.waited = getattr(self._local, "waited", 0.0) + waited
+        start = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self._observe(time.monotonic() - start, error=True)
+            raise
+        self._observe(time.monotonic() - start, error=False)
+
+    def throttled_s(self) -> float:
+        """当前线程累计因限速而等待的秒数；前后两次读数之差就是这段时间里的限速等待。"""
+
+        return float(getattr(self._local, "waited", 0.0))
+
+    def _observe(self, latency: float, *, error: bool) -> None:
+        if self.max_rate <= 0:
+            return
+        with self._lock:
+            self._latencies.append(latency)
+            self._errors.append(error)
+            if self._baseline is None and not error:
+                self._first.append(latency)
+                if len(self._first) >= _BASELINE_SAMPLES:
+                    self._baseline = statistics.median(self._first)
+
+            # 样本太少时不做判断，避免偶发的一次慢/失败就降速。
+            enough = len(self._latencies) >= _BASELINE_SAMPLES
+            error_rate = sum(self._errors) / len(self._errors)
+            recent = statistics.median(self._latencies)
+            slow = enough and self._baseline is not None and recent > self._baseline * LATENCY_BACKOFF_RATIO
+            failing = enough and error_rate > ERROR_BACKOFF_RATE
+            rate = self.bucket.rate
+
+            if error or slow or failing:
+                self._healthy_streak = 0
+                if (slow or failing) and rate > self.min_rate:
+                    new_rate = max(self.min_rate, rate / 2)
+                    self.bucket.set_rate(new_rate)
+                    # 降速后重新观察，新的样本足够了才会再次降速。
+                    self._latencies.clear()
+                    self._errors.clear()
+                    print(
+                        f"后台响应变慢或出错增多（最近保存中位耗时 {recent:.2f} 秒，错误率 {error_rate:.0%}），"
+                        f"保存速率降为 {new_rate * 60:.1f} 次/分钟"
+                    )
+                return
+
+            self._healthy_streak += 1
+            if self._healthy_streak >= _RECOVER_AFTER and rate < self.max_rate:
+                self._healthy_streak = 0
+                self.bucket.set_rate(min(self.max_rate, rate + self.max_rate / 8))
+
+
+_SCHEDULER: WriteScheduler | None = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def save_rate(threads: int = 1) -> float:
+    """本进程的保存速率（次/秒）。
+
+    SAVES_PER_MINUTE 是所有 worker 的合计，按 xdist 进程数平分；
+    总共只有一个 worker（单进程、单线程）时返回 0，即不限速。
+    """
+
+    per_minute = setting_value("KM_SAVES_PER_MINUTE", "SAVES_PER_MINUTE", 30.0)
+    processes = max(1, int(os.getenv("PYTEST_XDIST_WORKER_COUNT", "1")))
+    if per_minute <= 0 or processes * max(1, threads) <= 1:
+        return 0.0
+    return per_minute / 60 / processes
+
+
+def get_scheduler(*, threads: int = 1) -> WriteScheduler:
+    """进程内共享的调度器（首次使用时按 settings 创建）。
+
+    threads：本进程内并行保存的 worker 线程数。单 worker 时不限速；
+    之后以 threads > 1 调用时再启用限速。
+    """
+
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = WriteScheduler(
+                rate_per_s=save_rate(threads),
+                burst=setting_value("KM_SAVE_BURST", "SAVE_BURST", 2.0),
+                max_sessions_per_account=setting_value("KM_SESSIONS_PER_ACCOUNT", "MAX_SESSIONS_PER_ACCOUNT", 2),
+            )
+        elif threads > 1 and _SCHEDULER.max_rate <= 0:
+            _SCHEDULER.set_max_rate(save_rate(threads))
+        return _SCHEDULER
@@ -18,3 +18,66 @@ DATA_YAML_PATH = "data/data.yaml"
 # True：不自动退出（会停在 page.pause()）
 # False：执行完自动关闭浏览器并结束运行
 PAUSE_AFTER_RUN = False
+
+# 进度事件流（JSON Lines）输出路径，留空则不输出；也可用环境变量 KM_PROGRESS_JSONL 指定。
+# 每个字段写一条事件，包含已完成数、速度（字段/秒）与预计剩余时间，便于外部工具实时监控。
+PROGRESS_JSONL_PATH = ""
+
+# 本地缓存目录（相对项目根目录），存放耗时统计等运行数据；也可用环境变量 KM_CACHE_DIR 指定。
+CACHE_DIR = ".km_cache"
+
+# 是否根据历史耗时自动调整每一步的等待超时。
+# True：按该步骤耗时的 p99 × 系数计算超时（有上下限），卡死的步骤更快失败
+# False：所有步骤统一使用 KM_TIMEOUT_MS
+ADAPTIVE_TIMEOUTS = True
+
+# 是否增量同步：只处理与上次成功同步相比新增或有变化的表（按表内容哈希判断，清单存放在缓存目录）。
+# 也可用环境变量 KM_INCREMENTAL=1/0 临时切换。首次运行没有清单时等同于全量。
+INCREMENTAL_SYNC = True
+
+# 保存后核对：处理完成后一次性拉取应用的表/字段列表，核对本次提交的内容是否都已保存。
+# 也可用环境变量 KM_VERIFY=1/0 切换。
+VERIFY_AFTER_RUN = True
+
+# 每处理多少张表核对一次（0 表示只在全部处理完后核对一次）；环境变量 KM_VERIFY_EVERY。
+VERIFY_EVERY_N_TABLES = 0
+
+# 核对发现缺少的表/字段时是否自动补齐（缺表重新新建，缺字段追加）；环境变量 KM_VERIFY_REPAIR。
+VERIFY_REPAIR = False
+
+# 是否向页面注入 DOM 辅助脚本，把填表名、批量填字段、检测重复提示合并成单次 evaluate（更快）。
+# 页面结构变化导致辅助脚本失效时会自动退回逐个输入框填写；也可用环境变量 KM_DOM_HELPERS=0 关闭。
+USE_DOM_HELPERS = True
+
+# 多个 worker 并行时对后台保存操作的限速（所有 worker 合计，次/分钟）与突发量；后台变慢或出错增多时会自动降速。
+# 只有一个 worker 时不限速；设为 0 则始终不限速。环境变量：KM_SAVES_PER_MINUTE / KM_SAVE_BURST
+SAVES_PER_MINUTE = 30
+SAVE_BURST = 2
+
+# 每个账号同时打开的会话数上限；环境变量 KM_SESSIONS_PER_ACCOUNT。
+# 只在同一进程内计数，pytest-xdist 的多个 worker 之间不共享。
+MAX_SESSIONS_PER_ACCOUNT = 2
+
+# 长时间运行时回收页面，避免内存上涨导致后面的表越来越慢。
+# "page"：在同一浏览器上下文里换新页面（保留登录状态）；"context"：换新上下文（带上 cookie/localStorage）；"off"：不回收。
+# 环境变量：KM_RECYCLE_MODE / KM_RECYCLE_HEAP_MB / KM_RECYCLE_SLOWDOWN / KM_RECYCLE_EVERY
+RECYCLE_MODE = "page"
+# JS 堆内存超过该值（MB）时回收（仅 Chromium）。
+RECYCLE_HEAP_MB = 400
+# 最近几张表的每字段耗时超过开头几张表的该倍数时回收。
+RECYCLE_SLOWDOWN_RATIO = 1.5
+# 每处理多少张表强制回收一次（0 表示只按上面两个条件）。
+RECYCLE_EVERY_N_TABLES = 0
+# 每处理多少张表检查一次内存与耗时趋势。
+RECYCLE_CHECK_EVERY = 5
+
+# 多账号：账号文件路径（每行 "手机号:密码[:会话数]"，# 开头为注释），留空则使用 KM_PHONE / KM_PASSWORD。
+# 也可以用环境变量 KM_ACCOUNTS="手机号:密码,手机号:密码" 或 KM_ACCOUNTS_FILE 指定。账号文件不要提交到仓库。
+ACCOUNTS_FILE = ""
+# 每个账号的登录状态缓存在 .km_cache/sessions/，超过该秒数重新登录；环境变量 KM_SESSION_MAX_AGE_S。
+SESSION_CACHE_MAX_AGE_S = 12 * 3600
+# 本地运行的并行 worker 数（每个 worker 一个浏览器、占用一个账号会话名额）；环境变量 KM_WORKERS。
+WORKERS = 1
+
+# 每次运行结束后把耗时与结果写入 .km_cache/history.sqlite3，用 python -m kuaimai_ui report 查看；环境变量 KM_HISTORY。
+RECORD_HISTORY = True
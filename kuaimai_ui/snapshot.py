@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+"""服务器现有表/字段的快照：解析、本地缓存与离线对比。
+
+快照的结构与 data/data.yaml 一致（list[TableSpec]），可以直接写成 YAML，
+也可以和数据文件离线对比，不需要再打开浏览器逐个点开检查。
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .flows.km_flow import TableSpec
+from .paths import cache_dir
+
+# 字段列表接口的返回结构未公开，这里按常见命名尽量识别。
+_TABLE_NAME_KEYS = ("tableName", "table_name", "dataTableName", "tableCnName", "tableTitle")
+_FIELD_LIST_KEYS = ("fields", "fieldList", "fieldVOList", "fieldVos", "columns", "details", "children")
+_FIELD_NAME_KEYS = ("cnName", "fieldCnName", "chineseName", "fieldName", "field_name", "label", "title", "name")
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """某个应用在某一时刻的服务器状态。"""
+
+    app_name: str
+    captured_at: float
+    source: str
+    tables: list[TableSpec]
+
+
+@dataclass
+class SnapshotDiff:
+    """数据文件（期望）与服务器快照（实际）的差异。"""
+
+    missing_tables: list[TableSpec] = field(default_factory=list)
+    # (期望的表定义, 服务器上缺少的字段)
+    missing_fields: list[tuple[TableSpec, list[str]]] = field(default_factory=list)
+    extra_tables: list[TableSpec] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing_tables and not self.missing_fields
+
+    def lines(self) -> list[str]:
+        result: list[str] = []
+        for table in self.missing_tables:
+            result.append(f"缺少表：{table.table_name}（{len(table.fields)} 个字段）")
+        for table, fields in self.missing_fields:
+            result.append(f"缺少字段：{table.table_name} -> {'、'.join(fields)}")
+        for table in self.extra_tables:
+            result.append(f"服务器多出的表：{table.table_name}")
+        return result
+
+
+def _walk_dicts(obj: object) -> Iterator[dict]:
+    if isinstance(obj, dict):
+        yield obj
+        for value in obj.values():
+            yield from _walk_dicts(value)
+    elif isinstance(obj, list):
+        for value in obj:
+            yield from _walk_dicts(value)
+
+
+def _first_str(d: dict, keys: Iterable[str], *, exclude: str | None = None) -> str | None:
+    for key in keys:
+        value = d.get(key)
+        if isinstance(value, str) and value.strip() and value.strip() != exclude:
+            return value.strip()
+    return None
+
+
+def tables_from_payloads(payloads: Iterable[object]) -> list[TableSpec]:
+    """从字段列表接口的 JSON 响应中提取表与字段。
+
+    支持两种常见结构：
+    - 表对象内嵌字段列表：{tableName, fields: [{cnName}, ...]}
+    - 扁平的字段行：[{tableName, cnName}, ...]
+    """
+
+    tables: dict[str, list[str]] = {}
+
+    def _add(table_name: str, field_name: str | None) -> None:
+        fields = tables.setdefault(table_name, [])
+        if field_name and field_name not in fields:
+            fields.append(field_name)
+
+    for payload in payloads:
+        for d in _walk_dicts(payload):
+            table_name = _first_str(d, _TABLE_NAME_KEYS)
+            if not table_name:
+                continue
+
+            nested = next((d[k] for k in _FIELD_LIST_KEYS if isinstance(d.get(k), list)), None)
+            if nested is not None:
+                tables.setdefault(table_name, [])
+                for item in nested:
+                    if isinstance(item, dict):
+                        _add(table_name, _first_str(item, _FIELD_NAME_KEYS, exclude=table_name))
+                    elif isinstance(item, str):
+                        _add(table_name, item.strip() or None)
+            else:
+                _add(table_name, _first_str(d, _FIELD_NAME_KEYS, exclude=table_name))
+
+    return [TableSpec(name="", table_name=t, fields=f) for t, f in tables.items()]
+
+
+def tables_from_rows(rows: Iterable[list[str]]) -> list[TableSpec]:
+    """DOM 兜底：列表每行的单元格文本，第一列为表名，第二列为字段名（用顿号/逗号/换行分隔）。
+
+    后面的列（创建时间、操作等）不是字段，不读取。
+    """
+
+    tables: dict[str, list[str]] = {}
+    for cells in rows:
+        cells = [c.strip() for c in cells if c and c.strip()]
+        if not cells:
+            continue
+        fields = tables.setdefault(cells[0], [])
+        if len(cells) < 2:
+            continue
+        for value in re.split(r"[、,，\n]+", cells[1]):
+            value = value.strip()
+            if value and value not in fields:
+                fields.append(value)
+    return [TableSpec(name="", table_name=t, fields=f) for t, f in tables.items()]
+
+
+def assign_node_names(tables: list[TableSpec], catalog: list[TableSpec] | None = None) -> list[TableSpec]:
+    """给快照里的表起 YAML 节点名：数据文件里已有同名表时沿用原节点名，否则用 TableNNN。"""
+
+    known = {t.table_name: t.name for t in catalog or []}
+    used: set[str] = set()
+    result: list[TableSpec] = []
+    for idx, table in enumerate(tables, start=1):
+        name = known.get(table.table_name) or f"Table{idx:03d}"
+        while name in used:
+            name = f"{name}_{idx}"
+        used.add(name)
+        result.append(TableSpec(name=name, table_name=table.table_name, fields=list(table.fields)))
+    return result
+
+
+def diff_tables(expected: list[TableSpec], actual: list[TableSpec]) -> SnapshotDiff:
+    """只看“期望有的是否都有”；服务器多出来的表单独列出，不算错误。"""
+
+    server = {t.table_name: t for t in actual}
+    wanted = {t.table_name for t in expected}
+    result = SnapshotDiff()
+
+    for table in expected:
+        if not table.fields:
+            continue
+        found = server.get(table.table_name)
+        if found is None:
+            result.missing_tables.append(table)
+            continue
+        have = set(found.fields)
+        missing = [f for f in table.fields if f not in have]
+        if missing:
+            result.missing_fields.append((table, missing))
+
+    result.extra_tables = [t for t in actual if t.table_name not in wanted]
+    return result
+
+
+def _snapshot_path(app_name: str) -> Path:
+    safe = re.sub(r'[\\/:*?"<>|\s]+', "_", app_name).strip("_") or "app"
+    folder = cache_dir() / "snapshots"
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder / f"{safe}.json"
+
+
+def save_snapshot(snapshot: Snapshot) -> Path:
+    path = _snapshot_path(snapshot.app_name)
+    data = {
+        "app_name": snapshot.app_name,
+        "captured_at": snapshot.captured_at,
+        "source": snapshot.source,
+        "tables": [{"table_name": t.table_name, "fields": t.fields} for t in snapshot.tables],
+    }
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def load_cached_snapshot(app_name: str, *, max_age_s: float | None = None) -> Snapshot | None:
+    """读取本地缓存的快照；不存在、损坏或超过 max_age_s 秒时返回 None。"""
+
+    try:
+        data = json.loads(_snapshot_path(app_name).read_text(encoding="utf-8"))
+        captured_at = float(data["captured_at"])
+        tables = [
+            TableSpec(name="", table_name=str(t["table_name"]), fields=[str(x) for x in t.get("fields") or []])
+            for t in data["tables"]
+        ]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    if max_age_s is not None and time.time() - captured_at > max_age_s:
+        return None
+    return Snapshot(app_name=app_name, captured_at=captured_at, source=str(data.get("source", "")), tables=tables)
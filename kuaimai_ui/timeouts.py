@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+"""按步骤自适应的等待超时。
+
+每个步骤（登录、打开弹窗、保存……）单独记录成功耗时，超时取：
+
+    clamp(p99 × 系数, 下限, 上限)
+
+样本不足时使用固定的 KM_TIMEOUT_MS。统计数据保存在缓存目录，跨运行累积。
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from .config import setting_flag
+from .paths import cache_dir
+
+TIMEOUT_MS = int(os.getenv("KM_TIMEOUT_MS", "30000"))
+FLOOR_MS = int(os.getenv("KM_TIMEOUT_FLOOR_MS", "3000"))
+FACTOR = float(os.getenv("KM_TIMEOUT_FACTOR", "3"))
+
+# 少于该样本数时不做自适应，直接用 TIMEOUT_MS。
+MIN_SAMPLES = 20
+# 每个步骤最多保留的样本数（只保留最近的）。
+MAX_SAMPLES = 500
+
+_STATS_FILE = "timeouts.json"
+
+
+def _adaptive_enabled() -> bool:
+    return setting_flag("KM_ADAPTIVE_TIMEOUTS", "ADAPTIVE_TIMEOUTS", True)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct * len(ordered)) - 1)
+    return ordered[index]
+
+
+class AdaptiveTimeouts:
+    """记录各步骤耗时，并据此给出超时（毫秒）。"""
+
+    def __init__(
+        self,
+        *,
+        path: Path | None = None,
+        default_ms: int = TIMEOUT_MS,
+        floor_ms: int = FLOOR_MS,
+        factor: float = FACTOR,
+        enabled: bool = True,
+    ) -> None:
+        self.path = path
+        self.default_ms = int(default_ms)
+        self.floor_ms = min(int(floor_ms), self.default_ms)
+        self.factor = float(factor)
+        self.enabled = enabled
+        self.samples: dict[str, list[float]] = {}
+        self._run_samples: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> "AdaptiveTimeouts":
+        """从缓存目录加载历史耗时；文件不存在或损坏时从空统计开始。"""
+
+        if path is None:
+            path = cache_dir() / _STATS_FILE
+        inst = cls(path=path, enabled=_adaptive_enabled())
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return inst
+
+        if isinstance(raw, dict):
+            for step, values in raw.items():
+                if isinstance(values, list):
+                    inst.samples[str(step)] = [float(v) for v in values if isinstance(v, (int, float))][-MAX_SAMPLES:]
+        return inst
+
+    def timeout_ms(self, step: str) -> int:
+        if not self.enabled:
+            return self.default_ms
+
+        with self._lock:
+            values = list(self.samples.get(step, ()))
+        if len(values) < MIN_SAMPLES:
+            return self.default_ms
+
+        learned = _percentile(values, 0.99) * 1000 * self.factor
+        return int(min(self.default_ms, max(self.floor_ms, learned)))
+
+    def record(self, step: str, seconds: float) -> None:
+        with self._lock:
+            bucket = self.samples.setdefault(step, [])
+            bucket.append(round(float(seconds), 4))
+            if len(bucket) > MAX_SAMPLES:
+                del bucket[: len(bucket) - MAX_SAMPLES]
+            self._run_samples.setdefault(step, []).append(float(seconds))
+
+    @contextmanager
+    def measure(self, step: str) -> Iterator[None]:
+        """计时一个步骤；只有正常结束才记录样本，超时/异常不计入。"""
+
+        start = time.monotonic()
+        yield
+        self.record(step, time.monotonic() - start)
+
+    def run_samples(self) -> dict[str, list[float]]:
+        """本进程内记录到的样本（不含历史）。"""
+
+        with self._lock:
+            return {k: list(v) for k, v in self._run_samples.items()}
+
+    def save(self) -> None:
+        """写回缓存文件。
+
+        多个 worker 线程（以及共用缓存目录的 pytest-xdist 进程）可能同时保存，
+        临时文件名按进程/线程区分，replace 是原子操作，最后写入的为准。
+        """
+
+        if self.path is None:
+            return
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with self._lock:
+            data = {k: list(v) for k, v in self.samples.items()}
+            tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(self.path)
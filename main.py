@@ -2,13 +2,13 @@
 
 """手动入口（可视化浏览器）。
 
-推荐使用：python scripts/run_local.py
+推荐使用：python -m kuaimai_ui run
 这里保留 main.py 仅用于兼容习惯。
 """
 
 from __future__ import annotations
 
-from scripts.run_local import run
+from kuaimai_ui.runner import run
 
 
 if __name__ == "__main__":
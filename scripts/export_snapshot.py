@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+"""导出应用现有的表与字段，写成 data.yaml 格式（等同于 python -m kuaimai_ui export）。
+
+- 导出：python scripts/export_snapshot.py --out data/snapshot.yaml
+- 离线对比（使用 1 小时内的本地快照，不打开浏览器）：python scripts/export_snapshot.py --diff --max-age 3600
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+# 直接运行 scripts/export_snapshot.py 时，sys.path[0] 是 scripts 目录。
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from kuaimai_ui.cli import main
+
+if __name__ == "__main__":
+    raise SystemExit(main(["export", *sys.argv[1:]]))
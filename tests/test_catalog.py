@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+"""数据文件里的每张表一个用例。
+
+- 并行：python -m pytest -n 4 --dist loadgroup
+- 重跑单张表：python -m pytest tests/test_catalog.py -k PickupOrderDetail
+- 只重跑失败的表：python -m pytest --lf
+"""
+
+import pytest
+
+from kuaimai_ui.flows.km_flow import load_table_specs_from_yaml, resolve_data_yaml_path
+
+TABLES = load_table_specs_from_yaml(resolve_data_yaml_path())
+
+
+@pytest.mark.parametrize(
+    "table",
+    [pytest.param(t, id=t.name, marks=pytest.mark.km_table(t.name)) for t in TABLES],
+)
+def test_create_table(km_session, table):
+    if not table.fields:
+        pytest.skip(f"空字段表：{table.table_name}")
+
+    result = km_session.create(table.table_name, table.fields)
+
+    if result.status == "duplicate":
+        pytest.skip(f"表名或字段名重复，已跳过：{table.table_name}")
+    assert result.ok, result.error
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+"""数据文件检查（不需要浏览器）。"""
+
+from kuaimai_ui.catalog import dedupe_fields, fix_tables, lint_tables
+from kuaimai_ui.flows.km_flow import (
+    TableSpec,
+    _drop_duplicate_fields,
+    load_table_specs_from_yaml,
+    resolve_data_yaml_path,
+)
+
+
+def test_data_yaml_is_clean():
+    yaml_file = resolve_data_yaml_path()
+    report = lint_tables(load_table_specs_from_yaml(yaml_file), raw_text=yaml_file.read_text(encoding="utf-8"))
+    assert report.ok, "\n".join(report.lines())
+
+
+def test_fix_dedupes_merges_and_drops_empty():
+    tables = [
+        TableSpec(name="A", table_name="订单", fields=["会员手机号(脱敏)", "数量", "会员手机号（脱敏）"]),
+        TableSpec(name="B", table_name="订单", fields=["数量", "门店"]),
+        TableSpec(name="C", table_name="空表", fields=[]),
+    ]
+    kinds = sorted(issue.kind for issue in lint_tables(tables).issues)
+    assert kinds == ["conflicting_table_name", "duplicate_field", "empty_table"]
+
+    fixed, _ = fix_tables(tables)
+    assert fixed == [TableSpec(name="A", table_name="订单", fields=["会员手机号(脱敏)", "数量", "门店"])]
+    assert lint_tables(fixed).ok
+
+
+def test_run_time_dedupe_keeps_width_variants():
+    fields = ["会员手机号(脱敏)", "数量", "会员手机号（脱敏）", "数量", " "]
+    assert dedupe_fields(fields, exact=True) == (["会员手机号(脱敏)", "数量", "会员手机号（脱敏）"], ["数量", " "])
+
+    table = TableSpec(name="A", table_name="订单", fields=fields)
+    assert _drop_duplicate_fields([table])[0].fields == ["会员手机号(脱敏)", "数量", "会员手机号（脱敏）"]
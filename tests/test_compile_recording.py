@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+"""录制脚本编译（不需要浏览器）。"""
+
+import importlib.util
+import re
+
+from kuaimai_ui.flows.step_runner import _value
+from kuaimai_ui.paths import PROJECT_ROOT
+
+_spec = importlib.util.spec_from_file_location("compile_recording", PROJECT_ROOT / "tools" / "compile_recording.py")
+compile_recording = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(compile_recording)
+
+RECORDING = '''
+import re
+from playwright.sync_api import Playwright, sync_playwright, expect
+
+
+def run(playwright: Playwright) -> None:
+    browser = playwright.chromium.launch(headless=False)
+    context = browser.new_context()
+    page = context.new_page()
+    page.goto("http://admin.iot.kuaimai.com/login")
+    page.get_by_placeholder("请输入手机号").click()
+    page.get_by_placeholder("请输入手机号").fill("138")
+    page.keyboard.press("Enter")
+    page.wait_for_timeout(1000)
+    page.get_by_role("menuitem", name=re.compile("模板", re.I)).click()
+    with page.expect_popup() as page1_info:
+        page.get_by_text("帮助").click()
+    page1 = page1_info.value
+    page1.get_by_role("button", name="确定").click()
+    expect(page.get_by_text("完成")).to_be_visible()
+    context.close()
+    browser.close()
+
+
+with sync_playwright() as playwright:
+    run(playwright)
+'''
+
+
+def test_compile_sample_recording():
+    flow, warnings = compile_recording.compile_recording(RECORDING.encode("utf-8"))
+    steps = flow["steps"]
+
+    assert [s["action"] for s in steps] == ["goto", "fill", "keyboard", "click", "expect_popup", "click"]
+    assert steps[2] == {"action": "keyboard", "method": "press", "args": ["Enter"], "kwargs": {}}
+    assert steps[3]["target"][0][2]["name"] == {"regex": "模板", "flags": "i"}
+
+    popup = steps[4]
+    assert popup["alias"] == "page1"
+    assert [s["action"] for s in popup["steps"]] == ["click"]
+    assert steps[5]["page"] == "page1"
+
+    # expect(...) 无法转换，必须提示而不是静默丢掉
+    assert len(warnings) == 1 and "expect(" in warnings[0]
+
+
+def test_regex_flags_round_trip():
+    assert _value({"regex": "模板", "flags": "i"}) == re.compile("模板", re.IGNORECASE)
+    assert _value({"regex": "a"}) == re.compile("a")
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+"""环境变量与 settings 的读取（不需要浏览器）。"""
+
+from kuaimai_ui import settings
+from kuaimai_ui.config import setting_flag, setting_value
+
+
+def test_flag_env_overrides_settings(monkeypatch):
+    monkeypatch.setattr(settings, "KM_TEST_FLAG", True, raising=False)
+    monkeypatch.delenv("KM_TEST_FLAG", raising=False)
+    assert setting_flag("KM_TEST_FLAG", "KM_TEST_FLAG", False) is True
+
+    for raw in ("0", "false", "Off", ""):
+        monkeypatch.setenv("KM_TEST_FLAG", raw)
+        assert setting_flag("KM_TEST_FLAG", "KM_TEST_FLAG", True) is False
+    monkeypatch.setenv("KM_TEST_FLAG", "yes")
+    assert setting_flag("KM_TEST_FLAG", "KM_MISSING_FLAG", False) is True
+
+
+def test_value_falls_back_and_converts(monkeypatch):
+    monkeypatch.delenv("KM_TEST_VALUE", raising=False)
+    assert setting_value("KM_TEST_VALUE", "KM_MISSING_VALUE", 5) == 5
+
+    monkeypatch.setattr(settings, "KM_TEST_VALUE", "", raising=False)
+    assert setting_value("KM_TEST_VALUE", "KM_TEST_VALUE", ".km_cache") == ".km_cache"
+
+    monkeypatch.setenv("KM_TEST_VALUE", " 2.5 ")
+    assert setting_value("KM_TEST_VALUE", "KM_TEST_VALUE", 1.0) == 2.5
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""账号解析与凭据池（不需要浏览器）。"""
+
+import threading
+
+import pytest
+
+from kuaimai_ui.credentials import Account, CredentialPool, _parse_account
+
+
+@pytest.mark.parametrize(
+    "raw, password, sessions",
+    [
+        ("13800000000:secret", "secret", None),
+        ("13800000000:secret:3", "secret", 3),
+        ("13800000000:a:b:c", "a:b:c", None),
+        ("13800000000:a:b:2", "a:b", 2),
+        ("13800000000:pass:12:", "pass:12", None),
+    ],
+)
+def test_parse_account_allows_colons_in_password(raw, password, sessions):
+    account = _parse_account(raw)
+    assert (account.phone, account.password, account.max_sessions) == ("13800000000", password, sessions)
+
+
+def test_parse_account_skips_comments_and_rejects_missing_password():
+    assert _parse_account("  # 注释") is None
+    with pytest.raises(RuntimeError):
+        _parse_account("13800000000")
+
+
+def test_pool_balances_accounts_and_respects_quota():
+    a, b = Account("13800000001", "x"), Account("13800000002", "y", max_sessions=1)
+    pool = CredentialPool([a, b], default_sessions=2)
+    assert pool.capacity == 3
+
+    with pool.lease() as first, pool.lease() as second, pool.lease() as third:
+        assert sorted([first.phone, second.phone, third.phone]) == [a.phone, a.phone, b.phone]
+
+        got: list[Account] = []
+
+        def _wait() -> None:
+            with pool.lease() as account:
+                got.append(account)
+
+        waiter = threading.Thread(target=_wait)
+        waiter.start()
+        waiter.join(timeout=0.2)
+        assert waiter.is_alive() and not got
+    waiter.join(timeout=2)
+    assert got
+
+
+def test_failed_account_is_paused(monkeypatch):
+    monkeypatch.setattr("builtins.print", lambda *args, **kwargs: None)
+    a, b = Account("13800000001", "x"), Account("13800000002", "y")
+    pool = CredentialPool([a, b], default_sessions=1)
+    assert pool.report_failure(a) > 0
+    with pool.lease(prefer=0) as account:
+        assert account == b
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""运行历史与回归报告（不需要浏览器）。"""
+
+import pytest
+
+from kuaimai_ui.flows import km_flow
+from kuaimai_ui.flows.km_flow import TableResult, _resolve_run_flags
+from kuaimai_ui.history import build_report, connect, record_run
+from kuaimai_ui.timeouts import AdaptiveTimeouts
+
+
+def _run(db, *, started_at, per_field, save_s, ok=True, results=None):
+    results = results if results is not None else [
+        TableResult(table_name="订单", status="created", field_count=10, duration_s=per_field * 10),
+        TableResult(table_name="会员", status="unchanged", field_count=5),
+    ]
+    return record_run(
+        app="测试应用",
+        catalog_hash="abc",
+        profile="headless slow_mo=0 incremental verify",
+        workers=1,
+        ok=ok,
+        started_at=started_at,
+        duration_s=per_field * 10,
+        results=results,
+        step_samples={"save": [save_s] * 3, "fill": [0.1] * 3},
+        path=db,
+    )
+
+
+def test_report_flags_slow_tables_and_server_steps(tmp_path):
+    db = tmp_path / "history.sqlite3"
+    for i in range(3):
+        _run(db, started_at=1000 + i, per_field=1.0, save_s=0.5)
+    _run(db, started_at=2000, per_field=3.0, save_s=2.0)
+
+    report = "\n".join(build_report(path=db))
+    assert "订单：1.00 -> 3.00 秒/字段" in report
+    assert "save：500 -> 2000 毫秒" in report
+    assert "远程后台" in report
+    # 未变化的表不写入 run_tables
+    assert "会员" not in report
+
+
+def test_failed_run_keeps_partial_results(tmp_path):
+    db = tmp_path / "history.sqlite3"
+    partial = [TableResult(table_name="订单", status="created", field_count=10, duration_s=5.0)]
+    run_id = _run(db, started_at=1000, per_field=1.0, save_s=0.5, ok=False, results=partial)
+
+    conn = connect(db)
+    try:
+        row = conn.execute("SELECT ok, tables_done FROM runs WHERE id = ?", (run_id,)).fetchone()
+        tables = conn.execute("SELECT table_name FROM run_tables WHERE run_id = ?", (run_id,)).fetchall()
+    finally:
+        conn.close()
+    assert (row["ok"], row["tables_done"]) == (0, 1)
+    assert [t["table_name"] for t in tables] == ["订单"]
+
+
+def test_profile_flags_follow_environment(monkeypatch):
+    monkeypatch.setenv("KM_INCREMENTAL", "0")
+    monkeypatch.setenv("KM_VERIFY", "1")
+    assert _resolve_run_flags(None, None) == (False, True)
+    assert _resolve_run_flags(True, False) == (True, False)
+
+
+class _ClosedPage:
+    """流程本身被替换掉，会话只需要知道页面已关闭。"""
+
+    def is_closed(self) -> bool:
+        return True
+
+
+def test_failing_table_is_kept_in_results(tmp_path, monkeypatch):
+    """stop_on_error 时出错的表直接抛出，结果列表里也要有这张失败的表。"""
+
+    monkeypatch.setenv("KM_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("KM_DOM_HELPERS", "0")
+    monkeypatch.setenv("KM_RECYCLE_MODE", "off")
+    monkeypatch.setattr(km_flow, "_TIMEOUTS", AdaptiveTimeouts(path=tmp_path / "timeouts.json"))
+    monkeypatch.setattr(km_flow, "open_field_management", lambda page: None)
+    monkeypatch.setattr(km_flow, "select_app", lambda page, app_name: None)
+
+    def _create(page, *, table_name, field_values, progress, worker):
+        if table_name == "表3":
+            raise RuntimeError("保存失败")
+        return True
+
+    monkeypatch.setattr(km_flow, "_create_one_table", _create)
+    yaml_file = tmp_path / "data.yaml"
+    yaml_file.write_text(
+        "".join(f'T{i}:\n  table_name: "表{i}"\n  fields:\n    - "字段{i}"\n' for i in range(1, 5)),
+        encoding="utf-8",
+    )
+
+    results: list[TableResult] = []
+    with pytest.raises(RuntimeError, match="保存失败"):
+        km_flow.create_tables_from_yaml(
+            _ClosedPage(), app_name="测试应用", yaml_path=yaml_file, incremental=False, verify=False, results=results
+        )
+    assert [(r.table_name, r.status) for r in results] == [("表1", "created"), ("表2", "created"), ("表3", "failed")]
+    assert results[-1].error == "保存失败"
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+"""启动耗时预算：import kuaimai_ui 与命令行入口不应加载流程模块、Playwright 或 PyYAML。"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# 导入 kuaimai_ui + kuaimai_ui.cli 的耗时上限（秒，不含解释器自身启动）。
+IMPORT_BUDGET_S = 0.15
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import kuaimai_ui, kuaimai_ui.cli
+elapsed = time.perf_counter() - start
+heavy = [m for m in ("playwright", "yaml", "kuaimai_ui.flows.km_flow") if m in sys.modules]
+print(json.dumps({"elapsed": elapsed, "heavy": heavy}))
+"""
+
+
+def _probe() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout)
+
+
+def test_cli_import_is_light():
+    result = _probe()
+
+    assert result["heavy"] == []
+
+
+def test_cli_import_within_budget():
+    # 取多次中的最小值，减少机器抖动的影响。
+    elapsed = min(_probe()["elapsed"] for _ in range(3))
+
+    assert elapsed < IMPORT_BUDGET_S, f"导入耗时 {elapsed:.3f} 秒，超过预算 {IMPORT_BUDGET_S} 秒"
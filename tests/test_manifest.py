@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""同步清单与增量计划（不需要浏览器）。"""
+
+from kuaimai_ui.flows.km_flow import TableResult, TableSpec, _sync_action
+from kuaimai_ui.manifest import Manifest
+
+APP = "测试应用"
+
+
+def _table(*fields: str) -> TableSpec:
+    return TableSpec(name="Order", table_name="订单", fields=list(fields))
+
+
+def test_plan_new_unchanged_changed_relabel(tmp_path):
+    manifest = Manifest(tmp_path / "manifest.json")
+    assert [t.table_name for t in manifest.plan(APP, [_table("单号", "门店")]).new] == ["订单"]
+
+    manifest.mark_synced(APP, _table("单号", "门店"))
+    manifest.save()
+    manifest = Manifest.load(tmp_path / "manifest.json")
+
+    assert len(manifest.plan(APP, [_table("单号", "门店")]).unchanged) == 1
+    assert manifest.plan(APP, [_table("单号", "门店", "数量")]).changed[0][1] == ["数量"]
+    assert len(manifest.plan(APP, [_table("门店", "单号")]).relabel) == 1
+    assert len(manifest.plan(APP, [_table()]).empty) == 1
+    # 其他应用不受影响。
+    assert len(manifest.plan("其他应用", [_table("单号", "门店")]).new) == 1
+
+
+def test_duplicate_is_not_marked_synced(tmp_path):
+    manifest = Manifest(tmp_path / "manifest.json")
+    table = _table("单号", "门店", "数量")
+    duplicate = TableResult(table_name="订单", status="duplicate", field_count=3)
+
+    assert _sync_action(duplicate, verify=False) is None
+    assert _sync_action(duplicate, verify=True) == "verify"
+    assert _sync_action(TableResult(table_name="订单", status="failed", field_count=3), verify=True) is None
+
+    # 保存被拒绝时不写清单，下次运行仍会处理这张表。
+    assert len(manifest.plan(APP, [table]).new) == 1
+
+
+def test_created_is_marked_or_verified():
+    created = TableResult(table_name="订单", status="created", field_count=3)
+    assert _sync_action(created, verify=False) == "mark"
+    assert _sync_action(created, verify=True) == "verify"
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+"""页面回收的变慢判断（不需要浏览器）。"""
+
+from kuaimai_ui.flows.km_flow import load_table_specs_from_yaml, resolve_data_yaml_path
+from kuaimai_ui.recycler import PageHealth
+
+
+def _health() -> PageHealth:
+    health = PageHealth(page=None)
+    health.heap_limit_mb = float("inf")
+    health.slowdown_ratio = 1.5
+    health.every_n_tables = 0
+    health.check_every = 5
+    health._cdp_failed = True
+    return health
+
+
+def _sizes() -> list[int]:
+    tables = load_table_specs_from_yaml(resolve_data_yaml_path())
+    return sorted((len(t.fields) for t in tables if t.fields), reverse=True)
+
+
+def test_constant_speed_largest_first_does_not_recycle():
+    # 固定开销 4 秒 + 每字段 0.3 秒，表按字段数从大到小处理。
+    health = _health()
+    for n in _sizes():
+        health.record_table(4 + 0.3 * n, n)
+        assert health.should_recycle() is None
+
+
+def test_real_slowdown_recycles():
+    health = _health()
+    reasons = []
+    for i, n in enumerate(_sizes()):
+        factor = 2.0 if i >= 20 else 1.0
+        health.record_table((4 + 0.3 * n) * factor, n)
+        reasons.append(health.should_recycle())
+    assert any(reasons[20:])
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""保存调度（不需要浏览器）。"""
+
+import threading
+
+import pytest
+
+from kuaimai_ui.scheduler import TokenBucket, WriteScheduler, save_rate
+
+
+def test_bucket_waits_after_burst_and_zero_rate_is_unlimited():
+    bucket = TokenBucket(rate_per_s=50, burst=1)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() > 0
+
+    unlimited = TokenBucket(rate_per_s=0, burst=1)
+    assert all(unlimited.acquire() == 0 for _ in range(100))
+
+
+def test_single_worker_is_not_throttled(monkeypatch):
+    monkeypatch.setenv("KM_SAVES_PER_MINUTE", "60")
+    monkeypatch.delenv("PYTEST_XDIST_WORKER_COUNT", raising=False)
+    assert save_rate(threads=1) == 0
+    assert save_rate(threads=4) == 1.0
+
+    monkeypatch.setenv("PYTEST_XDIST_WORKER_COUNT", "4")
+    assert save_rate(threads=1) == 0.25
+
+
+def test_order_is_largest_first_and_stable():
+    items = [("a", 1), ("b", 5), ("c", 1), ("d", 5)]
+    assert WriteScheduler.order(items, size=lambda item: item[1]) == [("b", 5), ("d", 5), ("a", 1), ("c", 1)]
+
+
+def test_backs_off_when_saves_slow_down():
+    scheduler = WriteScheduler(rate_per_s=1.0)
+    for _ in range(5):
+        scheduler._observe(1.0, error=False)
+    for _ in range(5):
+        scheduler._observe(5.0, error=False)
+    assert scheduler.bucket.rate == pytest.approx(0.5)
+
+
+def test_unlimited_scheduler_never_throttles():
+    scheduler = WriteScheduler(rate_per_s=0)
+    for latency in [1.0] * 5 + [10.0] * 10:
+        with scheduler.save_slot():
+            pass
+        scheduler._observe(latency, error=False)
+    assert scheduler.bucket.rate == 0
+
+    scheduler.set_max_rate(2.0)
+    assert scheduler.bucket.rate == 2.0 and scheduler.min_rate == 0.25
+
+
+def test_throttle_wait_is_tracked_per_thread():
+    scheduler = WriteScheduler(rate_per_s=50, burst=1)
+    before = scheduler.throttled_s()
+    for _ in range(3):
+        with scheduler.save_slot():
+            pass
+    assert scheduler.throttled_s() - before > 0
+
+    waits: list[float] = []
+    worker = threading.Thread(target=lambda: waits.append(scheduler.throttled_s()))
+    worker.start()
+    worker.join()
+    assert waits == [0.0]
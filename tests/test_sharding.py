@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+"""按字段数分片（不需要浏览器）。"""
+
+from kuaimai_ui.flows.km_flow import TableSpec
+from kuaimai_ui.sharding import assign_shards
+
+
+def _table(name: str, n: int) -> TableSpec:
+    return TableSpec(name=name, table_name=name, fields=[f"f{i}" for i in range(n)])
+
+
+def test_shards_are_balanced_and_deterministic():
+    tables = [_table("A", 10), _table("B", 6), _table("C", 5), _table("D", 4), _table("E", 0)]
+    shards = assign_shards(tables, 2)
+
+    loads = [0, 0]
+    for table in tables:
+        loads[shards[table.name]] += max(1, len(table.fields))
+    assert loads == [14, 12]
+    assert assign_shards(list(reversed(tables)), 2) == shards
+
+
+def test_single_shard_takes_everything():
+    assert set(assign_shards([_table("A", 3), _table("B", 1)], 0).values()) == {0}
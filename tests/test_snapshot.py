@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+"""服务器快照解析与对比（不需要浏览器）。"""
+
+from kuaimai_ui.flows.km_flow import TableSpec
+from kuaimai_ui.snapshot import diff_tables, tables_from_payloads, tables_from_rows
+
+
+def test_payloads_nested_and_flat_across_pages():
+    page1 = {"data": {"list": [{"tableName": "订单", "fieldList": [{"cnName": "数量"}, {"cnName": "门店"}]}]}}
+    page2 = {"data": [{"tableName": "会员", "cnName": "手机号"}, {"tableName": "会员", "cnName": "等级"}]}
+
+    tables = tables_from_payloads([page1, page2, {"code": 0}])
+    assert [(t.table_name, t.fields) for t in tables] == [("订单", ["数量", "门店"]), ("会员", ["手机号", "等级"])]
+
+
+def test_rows_fallback_and_diff():
+    actual = tables_from_rows([["订单", "数量、门店", "2024-01-01", "编辑"], ["", ""]])
+    assert actual[0].fields == ["数量", "门店"]
+    expected = [
+        TableSpec(name="A", table_name="订单", fields=["数量", "门店", "金额"]),
+        TableSpec(name="B", table_name="会员", fields=["手机号"]),
+    ]
+
+    diff = diff_tables(expected, actual)
+    assert [t.table_name for t in diff.missing_tables] == ["会员"]
+    assert [(t.table_name, missing) for t, missing in diff.missing_fields] == [("订单", ["金额"])]
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+"""自适应超时（不需要浏览器）。"""
+
+import threading
+
+from kuaimai_ui.timeouts import MIN_SAMPLES, AdaptiveTimeouts
+
+
+def test_timeout_uses_p99_after_enough_samples(tmp_path):
+    stats = AdaptiveTimeouts(path=tmp_path / "t.json", default_ms=30000, floor_ms=1000, factor=3)
+    for _ in range(MIN_SAMPLES - 1):
+        stats.record("save", 1.0)
+    assert stats.timeout_ms("save") == 30000
+
+    stats.record("save", 1.0)
+    assert stats.timeout_ms("save") == 3000
+
+
+def test_concurrent_save_from_worker_threads(tmp_path):
+    path = tmp_path / "timeouts.json"
+    stats = AdaptiveTimeouts(path=path)
+    stats.record("save", 0.5)
+    errors: list[BaseException] = []
+
+    def _save() -> None:
+        try:
+            for _ in range(20):
+                stats.save()
+        except BaseException as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_save) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert AdaptiveTimeouts.load(path).samples == {"save": [0.5]}
+    assert list(tmp_path.glob("*.tmp")) == []
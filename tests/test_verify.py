@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+"""保存后核对的结果判断（不需要浏览器）。"""
+
+from kuaimai_ui.flows.km_flow import TableResult, TableSpec
+from kuaimai_ui.flows.verify_flow import VerifyReport
+from kuaimai_ui.snapshot import SnapshotDiff
+
+
+def test_duplicate_repair_is_not_counted_as_fixed():
+    orders = TableSpec(name="A", table_name="订单", fields=["数量", "金额"])
+    members = TableSpec(name="B", table_name="会员", fields=["手机号"])
+    report = VerifyReport(
+        checked=2,
+        diff=SnapshotDiff(missing_fields=[(orders, ["金额"])], missing_tables=[members]),
+        repaired=[
+            TableResult(table_name="订单", status="duplicate", field_count=1),
+            TableResult(table_name="会员", status="created", field_count=1),
+        ],
+    )
+    assert report.unresolved == ["订单"]
+    assert not report.ok
@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+
+"""把 Playwright Inspector 录制的代码编译成声明式步骤列表（JSON）。
+
+处理流程：
+1) 与 normalize_playwright_code.py 相同的 tokenize 清理（去图标字符、修复乱码）
+2) AST 解析，提取对 page 的操作（goto / click / fill / press / check / select_option …），
+   以及 page.keyboard / page.mouse 操作和 expect_popup 打开的新页面（page1 = page1_info.value）
+3) 优化：
+   - 去掉 wait_for_timeout 这类固定等待（执行器按元素可见自动等待）
+   - 合并对同一元素的连续点击；点击后紧接着对同一元素 fill 时去掉该点击
+   - 对同一元素的连续 fill 只保留最后一次
+   - 连续多个 fill 合并成一个 fill_many 步骤
+4) 输出 JSON，由 kuaimai_ui/flows/step_runner.py 执行
+
+无法转换的操作（例如断言 expect(...)）会逐条给出警告，编译结果不会悄悄缺步骤。
+
+用法：
+    python tools/compile_recording.py recorded.py --out flows/new_flow.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(1, str(Path(__file__).resolve().parents[1]))
+
+from normalize_playwright_code import _rewrite_python_bytes  # noqa: E402
+
+# 定位链里允许的方法、page.keyboard / page.mouse 上允许的方法：与执行器共用同一份白名单。
+from kuaimai_ui.flows.step_runner import DEVICE_METHODS, LOCATOR_METHODS  # noqa: E402
+
+# 终结动作：方法名 -> 步骤 action，以及位置参数对应的字段名。
+ACTIONS = {
+    "click": ("click", ()),
+    "dblclick": ("dblclick", ()),
+    "fill": ("fill", ("value",)),
+    "press": ("press", ("key",)),
+    "check": ("check", ()),
+    "uncheck": ("uncheck", ()),
+    "select_option": ("select", ("value",)),
+    "hover": ("hover", ()),
+}
+
+# 录制代码里直接删除的调用（固定等待、调试）。
+DROPPED = {"wait_for_timeout", "pause"}
+
+# 打开新页面的等待（with page.expect_popup() as page1_info: ...）。
+POPUP_METHODS = {"expect_popup", "expect_page"}
+
+# re.compile 的 flags -> 步骤文件里的字母。
+REGEX_FLAGS = {
+    "I": "i",
+    "IGNORECASE": "i",
+    "M": "m",
+    "MULTILINE": "m",
+    "S": "s",
+    "DOTALL": "s",
+}
+
+
+class CompileError(ValueError):
+    pass
+
+
+def _regex_flags(node: ast.expr) -> str:
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        return _regex_flags(node.left) + _regex_flags(node.right)
+    if (
+        isinstance(node, ast.Attribute)
+        and isinstance(node.value, ast.Name)
+        and node.value.id == "re"
+        and node.attr in REGEX_FLAGS
+    ):
+        return REGEX_FLAGS[node.attr]
+    raise CompileError(f"不支持的正则标志：{ast.unparse(node)}")
+
+
+def _literal(node: ast.expr) -> Any:
+    """把参数转成 JSON 可表达的值；re.compile("x", re.I) 转成 {"regex": "x", "flags": "i"}。"""
+
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr == "compile"
+        and isinstance(node.func.value, ast.Name)
+        and node.func.value.id == "re"
+        and node.args
+    ):
+        value: dict[str, Any] = {"regex": ast.literal_eval(node.args[0])}
+        flag_nodes = node.args[1:2] + [kw.value for kw in node.keywords if kw.arg == "flags"]
+        if flag_nodes:
+            value["flags"] = "".join(sorted(set(_regex_flags(flag_nodes[0]))))
+        return value
+    return ast.literal_eval(node)
+
+
+def _chain(node: ast.expr, page_names: set[str]) -> tuple[str, list[list[Any]]] | None:
+    """把 page.get_by_role(...).nth(0) 这样的表达式拆成（页面变量, [[方法, 参数, 关键字参数], ...]）。
+
+    根对象不是页面变量时返回 None。
+    """
+
+    parts: list[list[Any]] = []
+    while True:
+        if isinstance(node, ast.Name):
+            return (node.id, list(reversed(parts))) if node.id in page_names else None
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            name = node.func.attr
+            if name not in LOCATOR_METHODS:
+                raise CompileError(f"不支持的定位方法：{name}")
+            args = [_literal(a) for a in node.args]
+            kwargs = {kw.arg: _literal(kw.value) for kw in node.keywords if kw.arg}
+            parts.append([name, args, kwargs])
+            node = node.func.value
+            continue
+
+        if isinstance(node, ast.Attribute) and node.attr in ("first", "last"):
+            parts.append([node.attr, [], {}])
+            node = node.value
+            continue
+
+        return None
+
+
+def _page_names(tree: ast.AST) -> set[str]:
+    names = {"page"}
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Assign)
+            and isinstance(node.value, ast.Call)
+            and isinstance(node.value.func, ast.Attribute)
+            and node.value.func.attr in ("new_page", "wait_for_event")
+        ):
+            names.update(t.id for t in node.targets if isinstance(t, ast.Name))
+    return names
+
+
+class _Extractor:
+    """按语句顺序遍历录制代码（含函数体与 with 块），生成原始步骤。"""
+
+    def __init__(self, pages: set[str]) -> None:
+        self.pages = pages
+        self.warnings: list[str] = []
+        # expect_popup 的 as 变量 -> 对应的步骤（等赋值 page1 = page1_info.value 时补上别名）
+        self.popups: dict[str, dict[str, Any]] = {}
+
+    def warn(self, node: ast.AST, message: str) -> None:
+        self.warnings.append(f"第 {getattr(node, 'lineno', 0)} 行：{message}")
+
+    def block(self, body: list[ast.stmt]) -> list[dict[str, Any]]:
+        steps: list[dict[str, Any]] = []
+        for stmt in body:
+            steps.extend(self.statement(stmt))
+        return steps
+
+    def statement(self, stmt: ast.stmt) -> list[dict[str, Any]]:
+        if isinstance(stmt, ast.FunctionDef):
+            return self.block(stmt.body)
+        if isinstance(stmt, ast.With):
+            return self.with_block(stmt)
+        if isinstance(stmt, ast.Assign):
+            self.assign(stmt)
+            return []
+        if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call):
+            try:
+                step = self.call(stmt.value, stmt.lineno)
+            except (CompileError, ValueError, IndexError) as exc:
+                self.warn(stmt, f"{exc}，已忽略")
+                return []
+            return [step] if step is not None else []
+        if isinstance(stmt, (ast.Import, ast.ImportFrom, ast.Pass)) or (
+            isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant)
+        ):
+            return []
+        self.warn(stmt, f"未能转换：{ast.unparse(stmt).splitlines()[0]}，已忽略")
+        return []
+
+    def with_block(self, stmt: ast.With) -> list[dict[str, Any]]:
+        for item in stmt.items:
+            call = item.context_expr
+            if (
+                isinstance(call, ast.Call)
+                and isinstance(call.func, ast.Attribute)
+                and call.func.attr in POPUP_METHODS
+                and isinstance(call.func.value, ast.Name)
+                and call.func.value.id in self.pages
+                and isinstance(item.optional_vars, ast.Name)
+            ):
+                step: dict[str, Any] = {
+                    "action": "expect_popup",
+                    "page": call.func.value.id,
+                    "steps": self.block(stmt.body),
+                    "line": stmt.lineno,
+                }
+                self.popups[item.optional_vars.id] = step
+                return [step]
+        # 其他 with（例如 with sync_playwright() as playwright）只展开其中的语句。
+        return self.block(stmt.body)
+
+    def assign(self, stmt: ast.Assign) -> None:
+        value = stmt.value
+        if (
+            isinstance(value, ast.Attribute)
+            and value.attr == "value"
+            and isinstance(value.value, ast.Name)
+            and value.value.id in self.popups
+            and len(stmt.targets) == 1
+            and isinstance(stmt.targets[0], ast.Name)
+        ):
+            alias = stmt.targets[0].id
+            self.popups[value.value.id]["alias"] = alias
+            self.pages.add(alias)
+
+    def call(self, call: ast.Call, line: int) -> dict[str, Any] | None:
+        if not isinstance(call.func, ast.Attribute):
+            # 例如 run(playwright)
+            return None
+
+        method = call.func.attr
+        target = call.func.value
+
+        if isinstance(target, ast.Name) and target.id in self.pages:
+            if method in DROPPED:
+                return {"action": "drop", "line": line}
+            if method == "goto":
+                return self._on_page({"action": "goto", "url": _literal(call.args[0]), "line": line}, target.id)
+            if method == "close":
+                return None
+            raise CompileError(f"未支持的页面方法 {target.id}.{method}")
+
+        if (
+            isinstance(target, ast.Attribute)
+            and target.attr in DEVICE_METHODS
+            and isinstance(target.value, ast.Name)
+            and target.value.id in self.pages
+        ):
+            if method not in DEVICE_METHODS[target.attr]:
+                raise CompileError(f"未支持的 {target.attr}.{method}")
+            step = {
+                "action": target.attr,
+                "method": method,
+                "args": [_literal(a) for a in call.args],
+                "kwargs": {kw.arg: _literal(kw.value) for kw in call.keywords if kw.arg},
+                "line": line,
+            }
+            return self._on_page(step, target.value.id)
+
+        if method == "close":
+            # context.close() / browser.close()
+            return None
+
+        if method not in ACTIONS:
+            raise CompileError(f"未能转换：{ast.unparse(call)}")
+        found = _chain(target, self.pages)
+        if found is None:
+            raise CompileError(f"未能转换：{ast.unparse(call)}")
+        root, chain = found
+
+        action, arg_names = ACTIONS[method]
+        step = {"action": action, "target": chain, "line": line}
+        for arg_name, arg in zip(arg_names, call.args):
+            step[arg_name] = _literal(arg)
+        return self._on_page(step, root)
+
+    @staticmethod
+    def _on_page(step: dict[str, Any], page_name: str) -> dict[str, Any]:
+        # 主页面不写 page 字段，保持与旧步骤文件兼容。
+        if page_name != "page":
+            step["page"] = page_name
+        return step
+
+
+def extract_steps(source: bytes) -> tuple[list[dict[str, Any]], list[str]]:
+    """返回（原始步骤, 警告）。"""
+
+    tree = ast.parse(_rewrite_python_bytes(source))
+    extractor = _Extractor(_page_names(tree))
+    steps = extractor.block(tree.body)
+    return steps, extractor.warnings
+
+
+def optimize(
+    steps: list[dict[str, Any]], stats: dict[str, int] | None = None
+) -> tuple[list[dict[str, Any]], dict[str, int]]:
+    if stats is None:
+        stats = {"recorded": 0, "dropped_waits": 0, "merged_clicks": 0, "merged_fills": 0, "emitted": 0}
+    stats["recorded"] += len(steps)
+
+    result: list[dict[str, Any]] = []
+    for step in steps:
+        step = {k: v for k, v in step.items() if k != "line"}
+        if step["action"] == "drop":
+            stats["dropped_waits"] += 1
+            continue
+        if step["action"] == "expect_popup":
+            step["steps"], _ = optimize(step["steps"], stats)
+
+        prev = result[-1] if result else None
+        same_target = (
+            prev is not None
+            and "target" in step
+            and prev.get("target") == step["target"]
+            and prev.get("page") == step.get("page")
+        )
+
+        if step["action"] == "click" and same_target and prev["action"] == "click":
+            stats["merged_clicks"] += 1
+            continue
+        if step["action"] == "fill" and same_target and prev["action"] in ("click", "fill"):
+            # fill 会自动聚焦，之前的点击/填写都多余。
+            if prev["action"] == "click":
+                stats["merged_clicks"] += 1
+            else:
+                stats["merged_fills"] += 1
+            result[-1] = step
+            continue
+        result.append(step)
+
+    batched: list[dict[str, Any]] = []
+    for step in result:
+        prev = batched[-1] if batched else None
+        if (
+            step["action"] == "fill"
+            and prev is not None
+            and prev["action"] in ("fill", "fill_many")
+            and prev.get("page") == step.get("page")
+        ):
+            if prev["action"] == "fill":
+                prev = {"action": "fill_many", "fills": [{"target": prev["target"], "value": prev["value"]}]}
+                if "page" in step:
+                    prev["page"] = step["page"]
+                batched[-1] = prev
+            prev["fills"].append({"target": step["target"], "value": step["value"]})
+            continue
+        batched.append(step)
+
+    stats["emitted"] += len(batched)
+    return batched, stats
+
+
+def compile_recording(source: bytes) -> tuple[dict[str, Any], list[str]]:
+    raw, warnings = extract_steps(source)
+    steps, stats = optimize(raw)
+    return {"version": 2, "stats": stats, "steps": steps}, warnings
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="把 Playwright 录制代码编译成步骤列表（JSON）。")
+    parser.add_argument("path", help="录制得到的 .py 文件")
+    parser.add_argument("--out", help="输出 JSON 路径（默认打印到终端）")
+    args = parser.parse_args(argv)
+
+    flow, warnings = compile_recording(Path(args.path).read_bytes())
+    for msg in warnings:
+        print(msg, file=sys.stderr)
+
+    text = json.dumps(flow, ensure_ascii=False, indent=2) + "\n"
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(text, encoding="utf-8")
+        stats = flow["stats"]
+        print(f"已生成：{out}（录制 {stats['recorded']} 步 -> {stats['emitted']} 步）")
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))